@@ -1,19 +1,30 @@
 #!/usr/bin/env python3
 """
 Simple YouTube Subscriptions Fetcher
-Uses manual authorization code input to avoid redirect URI issues.
+Receives the OAuth authorization code on a loopback server at http://localhost:8765/
+(the OAuth client must allow that exact redirect URI); pasting the code by hand
+remains as a fallback.
 """
 
 import argparse
+import heapq
 import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
 
 import requests
 from dotenv import load_dotenv
 
+from utils import CacheManager, CacheTTL, QuotaLimitError, QuotaTracker, create_session, get_logger, serialization
+
 # OAuth 2.0 settings
 OAUTH_SCOPE = "https://www.googleapis.com/auth/youtube.readonly"
 YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
@@ -25,6 +36,32 @@ SUBSCRIPTIONS_QUOTA_COST = 1  # per subscriptions request
 DAILY_QUOTA_LIMIT = 10000  # free tier limit
 SAFETY_BUFFER = 500  # reserve some quota for safety
 
+# Loopback redirect that receives the OAuth authorization code
+OAUTH_REDIRECT_PORT = 8765
+OAUTH_REDIRECT_URI = f"http://localhost:{OAUTH_REDIRECT_PORT}/"
+OAUTH_CALLBACK_TIMEOUT = 300  # seconds to wait for the browser redirect
+
+# Persisted OAuth tokens (access + refresh)
+TOKEN_CACHE_PATH = os.path.join(".cache", "oauth_token.json")
+
+# Request parameters that never change between calls
+_SUBSCRIPTIONS_BASE_PARAMS = {"part": "snippet", "mine": "true"}
+_SEARCH_BASE_PARAMS = {"part": "snippet", "type": "video", "order": "viewCount"}
+_VIDEO_DETAILS_BASE_PARAMS = {"part": "snippet,statistics"}
+_VALID_SORTS = frozenset({"views", "likes", "comments"})
+
+MAX_WORKERS = 10  # concurrent channel lookups
+
+# Shared keep-alive session for all googleapis.com calls
+SESSION = create_session()
+
+# Channel searches cost 100 units each: memoize per run and persist for an hour
+_SEARCH_MEMO: Dict[Tuple[str, str, int], List[Dict]] = {}
+SEARCH_CACHE = CacheManager(".cache")
+SEARCH_CACHE_TTL = CacheTTL.HOUR
+
+logger = get_logger(__name__)
+
 
 def get_oauth_credentials() -> Tuple[str, str]:
     """Get OAuth client ID and secret from JSON file or environment."""
@@ -69,70 +106,214 @@ def get_oauth_credentials() -> Tuple[str, str]:
 
 
 def get_authorization_url(client_id: str) -> str:
-    """Generate OAuth authorization URL with manual redirect."""
+    """Generate OAuth authorization URL redirecting to the local receiver."""
     params = {
         "client_id": client_id,
-        "redirect_uri": "http://localhost",
+        "redirect_uri": OAUTH_REDIRECT_URI,
         "scope": OAUTH_SCOPE,
         "response_type": "code",
         "access_type": "offline",
         "prompt": "consent"
     }
     
-    param_string = "&".join([f"{k}={v}" for k, v in params.items()])
-    return f"https://accounts.google.com/o/oauth2/v2/auth?{param_string}"
+    return f"https://accounts.google.com/o/oauth2/v2/auth?{urlencode(params)}"
 
 
-def get_access_token(client_id: str, client_secret: str, auth_code: str) -> str:
-    """Exchange authorization code for access token."""
+def get_access_token(client_id: str, client_secret: str, auth_code: str) -> Tuple[str, Optional[str], int]:
+    """Exchange authorization code for access token, refresh token and lifetime."""
     url = "https://oauth2.googleapis.com/token"
     data = {
         "client_id": client_id,
         "client_secret": client_secret,
         "code": auth_code,
         "grant_type": "authorization_code",
-        "redirect_uri": "http://localhost"  # Match your JSON file
+        "redirect_uri": OAUTH_REDIRECT_URI  # Must match the authorization request
     }
     
-    response = requests.post(url, data=data)
+    response = SESSION.post(url, data=data)
     response.raise_for_status()
     
-    token_data = response.json()
-    return token_data["access_token"]
+    token_data = serialization.loads(response.content)
+    return token_data["access_token"], token_data.get("refresh_token"), int(token_data.get("expires_in", 3600))
+
+
+def refresh_access_token(client_id: str, client_secret: str, refresh_token: str) -> Tuple[str, int]:
+    """Obtain a new access token from a stored refresh token."""
+    url = "https://oauth2.googleapis.com/token"
+    data = {
+        "client_id": client_id,
+        "client_secret": client_secret,
+        "refresh_token": refresh_token,
+        "grant_type": "refresh_token",
+    }
+    
+    response = SESSION.post(url, data=data)
+    response.raise_for_status()
+    
+    token_data = serialization.loads(response.content)
+    return token_data["access_token"], int(token_data.get("expires_in", 3600))
+
+
+def _read_token_cache() -> Optional[Dict]:
+    """Read the persisted OAuth token file, if any."""
+    try:
+        with open(TOKEN_CACHE_PATH, 'rb') as f:
+            return serialization.loads(f.read())
+    except (FileNotFoundError, ValueError):  # ValueError: malformed JSON (either codec)
+        return None
+
+
+def save_cached_token(access_token: str, refresh_token: Optional[str], expires_in: int) -> None:
+    """Persist OAuth tokens with owner-only permissions."""
+    os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), exist_ok=True)
+    # Create the temp file as 0600 so the refresh token is never readable by others,
+    # then rename it over the old file (which also replaces any looser permissions)
+    tmp = f"{TOKEN_CACHE_PATH}.tmp.{os.getpid()}"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(serialization.dumps({
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expires_at": time.time() + expires_in,
+            }))
+        os.replace(tmp, TOKEN_CACHE_PATH)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def load_cached_token() -> Optional[str]:
+    """Return the cached access token if it is still valid for at least a minute."""
+    token_data = _read_token_cache()
+    if token_data and token_data.get("expires_at", 0) - 60 > time.time():
+        return token_data.get("access_token")
+    return None
+
+
+def wait_for_auth_code(timeout: float = OAUTH_CALLBACK_TIMEOUT) -> Optional[str]:
+    """Serve the loopback redirect and return the `code` parameter, or None on timeout."""
+
+    class CallbackHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            if "code" in query:
+                self.server.auth_code = query["code"][0]
+                message = "Authorization complete. You can close this window."
+            elif "error" in query:
+                self.server.auth_error = query["error"][0]
+                message = f"Authorization failed: {self.server.auth_error}"
+            else:
+                message = "Waiting for authorization..."
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(message.encode("utf-8"))
+
+        def log_message(self, format, *args):
+            pass  # keep the console quiet
+
+    server = HTTPServer(("localhost", OAUTH_REDIRECT_PORT), CallbackHandler)
+    server.auth_code = None
+    server.auth_error = None
+    deadline = time.monotonic() + timeout
+    try:
+        # Block on one request at a time (no serving thread or polling); stray requests
+        # such as /favicon.ico are answered and we keep waiting for the redirect.
+        while server.auth_code is None and server.auth_error is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            server.timeout = remaining
+            server.handle_request()
+    finally:
+        server.server_close()
+    return server.auth_code
+
+
+def obtain_access_token(client_id: str, client_secret: str) -> str:
+    """Get an access token from cache, then refresh token, then interactive consent."""
+    access_token = load_cached_token()
+    if access_token:
+        print("Using cached access token")
+        return access_token
+    
+    refresh_token = (_read_token_cache() or {}).get("refresh_token")
+    if refresh_token:
+        try:
+            print("Refreshing access token...")
+            access_token, expires_in = refresh_access_token(client_id, client_secret, refresh_token)
+            save_cached_token(access_token, refresh_token, expires_in)
+            return access_token
+        except requests.exceptions.HTTPError as e:
+            print(f"Token refresh failed ({e}); re-authorization required")
+    
+    # Get authorization URL
+    auth_url = get_authorization_url(client_id)
+    print(f"\nPlease visit this URL to authorize the application:")
+    print(auth_url)
+    print(f"\nWaiting for the browser to redirect to {OAUTH_REDIRECT_URI} ...")
+    
+    # Capture the authorization code from the redirect; fall back to pasting it
+    try:
+        auth_code = wait_for_auth_code()
+    except OSError as e:
+        print(f"Could not listen on port {OAUTH_REDIRECT_PORT} ({e})")
+        auth_code = None
+    if not auth_code:
+        print("Copy the 'code' parameter from the redirected URL and paste it below.")
+        auth_code = input("\nEnter the authorization code: ").strip()
+    
+    # Get access token
+    print("Getting access token...")
+    access_token, new_refresh_token, expires_in = get_access_token(client_id, client_secret, auth_code)
+    save_cached_token(access_token, new_refresh_token or refresh_token, expires_in)
+    return access_token
 
 
-def get_subscriptions(access_token: str, max_results: int = 50, quota_tracker: Optional[Dict[str, int]] = None) -> List[Dict]:
+@lru_cache(maxsize=4)
+def _auth_headers(access_token: str) -> Dict[str, str]:
+    """Build the Authorization header once per token (treat the result as read-only)."""
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def _no_charge(units: int) -> None:
+    """Stand-in for QuotaTracker.charge/refund when quota tracking is disabled."""
+
+
+def get_subscriptions(access_token: str, max_results: int = 50, quota_tracker: Optional[QuotaTracker] = None) -> List[Dict]:
     """Get user's YouTube subscriptions."""
     url = f"{YOUTUBE_API_BASE}/subscriptions"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    params = {
-        "part": "snippet",
-        "mine": "true",
-        "maxResults": min(max_results, 50)
-    }
+    headers = _auth_headers(access_token)
+    params = {**_SUBSCRIPTIONS_BASE_PARAMS, "maxResults": min(max_results, 50)}
     
     subscriptions = []
     next_page_token = None
+    charge = quota_tracker.charge if quota_tracker else _no_charge
+    refund = quota_tracker.refund if quota_tracker else _no_charge
     
     while True:
         if next_page_token:
             params["pageToken"] = next_page_token
         
-        # Check quota before making request
-        if quota_tracker:
-            estimated_cost = SUBSCRIPTIONS_QUOTA_COST
-            if quota_tracker.get("used", 0) + estimated_cost > DAILY_QUOTA_LIMIT - SAFETY_BUFFER:
-                print(f"Quota limit reached. Used: {quota_tracker.get('used', 0)}")
-                break
-        
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
+        # Check and reserve quota before making request
+        try:
+            charge(SUBSCRIPTIONS_QUOTA_COST)
+        except QuotaLimitError as e:
+            print(f"Quota limit reached. {e}")
+            break
         
-        # Track quota usage
-        if quota_tracker:
-            quota_tracker["used"] = quota_tracker.get("used", 0) + SUBSCRIPTIONS_QUOTA_COST
+        try:
+            response = SESSION.get(url, headers=headers, params=params)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            refund(SUBSCRIPTIONS_QUOTA_COST)  # failed calls don't count against the budget
+            raise
         
-        data = response.json()
+        data = serialization.loads(response.content)
         subscriptions.extend(data.get("items", []))
         
         if len(subscriptions) >= max_results:
@@ -146,65 +327,91 @@ def get_subscriptions(access_token: str, max_results: int = 50, quota_tracker: O
 
 
 def search_channel_videos(access_token: str, channel_id: str, published_after: datetime, 
-                         max_results: int = 10, quota_tracker: Optional[Dict[str, int]] = None) -> List[Dict]:
+                         max_results: int = 10, quota_tracker: Optional[QuotaTracker] = None) -> List[Dict]:
     """Search for videos from a specific channel published after a date."""
+    # Key on the day so reruns within the cache TTL reuse the same entry
+    memo_key = (channel_id, published_after.astimezone(timezone.utc).date().isoformat(), max_results)
+    if memo_key in _SEARCH_MEMO:
+        return _SEARCH_MEMO[memo_key]
+    key_material = "|".join(map(str, memo_key))
+    cached = SEARCH_CACHE.load("search", key_material, ttl=SEARCH_CACHE_TTL)
+    if cached is not None:
+        if quota_tracker:
+            quota_tracker.record_saved(SEARCH_QUOTA_COST)
+        _SEARCH_MEMO[memo_key] = cached
+        return cached
+
     url = f"{YOUTUBE_API_BASE}/search"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    headers = _auth_headers(access_token)
     params = {
-        "part": "snippet",
+        **_SEARCH_BASE_PARAMS,
         "channelId": channel_id,
-        "type": "video",
-        "order": "viewCount",
-        "publishedAfter": published_after.isoformat() + "Z",
+        "publishedAfter": published_after.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "maxResults": min(max_results, 50)
     }
     
-    # Check quota before making request
+    # Check and reserve quota before making request
     if quota_tracker:
-        estimated_cost = SEARCH_QUOTA_COST
-        if quota_tracker.get("used", 0) + estimated_cost > DAILY_QUOTA_LIMIT - SAFETY_BUFFER:
-            print(f"Quota limit reached. Used: {quota_tracker.get('used', 0)}")
+        try:
+            quota_tracker.charge(SEARCH_QUOTA_COST)
+        except QuotaLimitError as e:
+            print(f"Quota limit reached. {e}")
             return []
     
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    
-    # Track quota usage
-    if quota_tracker:
-        quota_tracker["used"] = quota_tracker.get("used", 0) + SEARCH_QUOTA_COST
+    try:
+        response = SESSION.get(url, headers=headers, params=params)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        if quota_tracker:
+            quota_tracker.refund(SEARCH_QUOTA_COST)  # failed calls don't count against the budget
+        raise
     
-    return response.json().get("items", [])
+    items = serialization.loads(response.content).get("items", [])
+    _SEARCH_MEMO[memo_key] = items
+    SEARCH_CACHE.save("search", key_material, items)
+    return items
 
 
-def get_video_details(access_token: str, video_ids: List[str], quota_tracker: Optional[Dict[str, int]] = None) -> List[Dict]:
+def get_video_details(access_token: str, video_ids: List[str], quota_tracker: Optional[QuotaTracker] = None) -> List[Dict]:
     """Get detailed statistics for videos."""
     url = f"{YOUTUBE_API_BASE}/videos"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    headers = _auth_headers(access_token)
     
-    results = []
+    chunks = []
+    charge = quota_tracker.charge if quota_tracker else _no_charge
+    refund = quota_tracker.refund if quota_tracker else _no_charge
     for i in range(0, len(video_ids), 50):
         chunk = video_ids[i:i+50]
         
-        # Check quota before making request
-        if quota_tracker:
-            estimated_cost = VIDEO_DETAILS_QUOTA_COST * len(chunk)
-            if quota_tracker.get("used", 0) + estimated_cost > DAILY_QUOTA_LIMIT - SAFETY_BUFFER:
-                print(f"Quota limit reached. Used: {quota_tracker.get('used', 0)}")
-                break
-        
-        params = {
-            "part": "snippet,statistics",
-            "id": ",".join(chunk)
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        
-        # Track quota usage
-        if quota_tracker:
-            quota_tracker["used"] = quota_tracker.get("used", 0) + VIDEO_DETAILS_QUOTA_COST * len(chunk)
+        # Check and reserve quota before making request
+        try:
+            charge(VIDEO_DETAILS_QUOTA_COST * len(chunk))
+        except QuotaLimitError as e:
+            print(f"Quota limit reached. {e}")
+            break
         
-        results.extend(response.json().get("items", []))
+        chunks.append(chunk)
+    
+    def fetch_chunk(chunk: List[str]) -> List[Dict]:
+        params = {**_VIDEO_DETAILS_BASE_PARAMS, "id": ",".join(chunk)}
+        try:
+            response = SESSION.get(url, headers=headers, params=params)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            refund(VIDEO_DETAILS_QUOTA_COST * len(chunk))  # reserved when the chunk was queued
+            raise
+        return serialization.loads(response.content).get("items", [])
+    
+    # Chunks are independent, so fetch them concurrently over the shared session;
+    # a failed chunk is skipped rather than discarding the others
+    results = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(fetch_chunk, chunk) for chunk in chunks]
+        for number, future in enumerate(futures, 1):
+            try:
+                results.extend(future.result())
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"Skipping video details chunk {number}/{len(futures)}: {e}")
     
     return results
 
@@ -217,8 +424,8 @@ def human_int(n: Optional[str]) -> int:
         return 0
 
 
-def assemble_results(video_items: List[Dict], sort_by: str = "views") -> List[Dict]:
-    """Assemble and sort video results."""
+def assemble_results(video_items: List[Dict], sort_by: str = "views", limit: Optional[int] = None) -> List[Dict]:
+    """Assemble and sort video results (only the top `limit` rows when given)."""
     assembled = []
     seen_video_ids = set()
     
@@ -228,22 +435,25 @@ def assemble_results(video_items: List[Dict], sort_by: str = "views") -> List[Di
             continue
         
         seen_video_ids.add(vid)
-        snippet = v.get("snippet", {})
-        stats = v.get("statistics", {})
+        snippet_get = v.get("snippet", {}).get
+        stats_get = v.get("statistics", {}).get
         
         assembled.append({
             "videoId": vid,
-            "title": snippet.get("title", ""),
-            "channelTitle": snippet.get("channelTitle", ""),
-            "publishedAt": snippet.get("publishedAt", ""),
-            "views": human_int(stats.get("viewCount")),
-            "likes": human_int(stats.get("likeCount")),
-            "comments": human_int(stats.get("commentCount")),
+            "title": snippet_get("title", ""),
+            "channelTitle": snippet_get("channelTitle", ""),
+            "publishedAt": snippet_get("publishedAt", ""),
+            "views": human_int(stats_get("viewCount")),
+            "likes": human_int(stats_get("likeCount")),
+            "comments": human_int(stats_get("commentCount")),
             "url": f"https://www.youtube.com/watch?v={vid}",
         })
     
-    sort_key = sort_by if sort_by in ["views", "likes", "comments"] else "views"
-    return sorted(assembled, key=lambda x: x[sort_key], reverse=True)
+    sort_key = itemgetter(sort_by if sort_by in _VALID_SORTS else "views")
+    if limit is None:
+        return sorted(assembled, key=sort_key, reverse=True)
+    # Same order as sorted(...)[:limit] but O(n log limit)
+    return heapq.nlargest(limit, assembled, key=sort_key)
 
 
 def print_table(rows: List[Dict], limit: int, sort_by: str = "views") -> None:
@@ -286,22 +496,11 @@ def main():
     # Get OAuth credentials
     client_id, client_secret = get_oauth_credentials()
     
-    # Get authorization URL
-    auth_url = get_authorization_url(client_id)
-    print(f"\nPlease visit this URL to authorize the application:")
-    print(auth_url)
-    print("\nAfter authorizing, you'll see a page with an authorization code.")
-    print("Copy that code and paste it below.")
-    
-    # Get authorization code
-    auth_code = input("\nEnter the authorization code: ").strip()
-    
-    # Get access token
-    print("Getting access token...")
-    access_token = get_access_token(client_id, client_secret, auth_code)
+    # Get access token (cached, refreshed, or interactive)
+    access_token = obtain_access_token(client_id, client_secret)
     
     # Initialize quota tracker
-    quota_tracker = {"used": 0, "saved": 0}
+    quota_tracker = QuotaTracker(daily_limit=DAILY_QUOTA_LIMIT, safety_buffer=SAFETY_BUFFER)
     
     # Calculate estimated quota usage
     estimated_subscriptions_cost = 1  # One subscription request
@@ -329,46 +528,59 @@ def main():
     
     print(f"Found {len(subscriptions)} subscriptions")
     
-    # Get videos from each channel
-    all_videos = []
-    
-    for i, sub in enumerate(subscriptions, 1):
-        channel_info = sub["snippet"]
-        channel_title = channel_info["title"]
-        channel_id = channel_info["resourceId"]["channelId"]
-        
-        print(f"[{i}/{len(subscriptions)}] Checking {channel_title}...")
-        
-        try:
-            videos = search_channel_videos(access_token, channel_id, published_after, args.videos_per_channel, quota_tracker)
-            
+    # Phase 1: search each channel concurrently and collect video IDs
+    all_video_ids = []
+    seen_video_ids = set()
+    total = len(subscriptions)
+
+    def search_channel(sub: Dict) -> List[Dict]:
+        channel_id = sub["snippet"]["resourceId"]["channelId"]
+        return search_channel_videos(access_token, channel_id, published_after, args.videos_per_channel, quota_tracker)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(search_channel, sub) for sub in subscriptions]
+        for i, (sub, future) in enumerate(zip(subscriptions, futures), 1):
+            channel_title = sub["snippet"]["title"]
+            logger.info("[%d/%d] Checking %s...", i, total, channel_title)
+            try:
+                videos = future.result()
+            except Exception as e:
+                logger.warning("  Error for %s: %s", channel_title, e)
+                continue
+
             if videos:
-                video_ids = [v["id"]["videoId"] for v in videos]
-                video_details = get_video_details(access_token, video_ids, quota_tracker)
-                
-                all_videos.extend(video_details)
-                print(f"  Found {len(video_details)} videos")
+                for v in videos:
+                    video_id = v["id"]["videoId"]
+                    if video_id not in seen_video_ids:
+                        seen_video_ids.add(video_id)
+                        all_video_ids.append(video_id)
+                logger.info("  Found %d videos", len(videos))
             else:
-                print(f"  No recent videos found")
-                
+                logger.info("  No recent videos found")
+    
+    # Phase 2: fetch details for all videos in batches of 50
+    all_videos = []
+    if all_video_ids:
+        print(f"Fetching details for {len(all_video_ids)} videos...")
+        try:
+            all_videos = get_video_details(access_token, all_video_ids, quota_tracker)
         except Exception as e:
             print(f"  Error: {e}")
-            continue
     
-    print(f"\nFinal quota usage: {quota_tracker['used']} units")
+    print(f"\nFinal quota usage: {quota_tracker.used} units")
     
     if not all_videos:
         print("No videos found from your subscriptions in the specified time period.")
         return
     
     # Process and sort results
-    results = assemble_results(all_videos, args.sort_by)
+    results = assemble_results(all_videos, args.sort_by, args.top)
     print_table(results, args.top, args.sort_by)
     
     # Save to JSON if requested
     if args.json:
-        with open(args.json, "w", encoding="utf-8") as f:
-            json.dump(results[:args.top], f, ensure_ascii=False, indent=2)
+        with open(args.json, "wb") as f:
+            f.write(serialization.dumps(results[:args.top], indent=True))
         print(f"\nResults saved to {args.json}")
 
 
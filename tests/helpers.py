@@ -0,0 +1,12 @@
+"""Shared fixtures for the test suite."""
+
+import requests
+
+
+def api_response(status_code: int, content: bytes = b"{}", url: str = "https://www.googleapis.com/youtube/v3/search") -> requests.Response:
+    """Build a `requests.Response` without a network round trip."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.url = url
+    return response
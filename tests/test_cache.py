@@ -0,0 +1,126 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils import CacheManager
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = self._tmp.name
+
+    def _manager(self, **kwargs) -> CacheManager:
+        cache = CacheManager(self.root, **kwargs)
+        self.addCleanup(cache.flush)  # stop any pending flush timer
+        return cache
+
+
+class MemoryLruTest(CacheTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = self._manager(memory_size=2)
+        cache.save("ns", "a", 1)
+        cache.save("ns", "b", 2)
+        cache.load("ns", "a")  # "b" is now the oldest
+        cache.save("ns", "c", 3)
+
+        self.assertEqual(len(cache._mem), 2)
+        self.assertNotIn(("ns", cache._hash_key("b")), cache._mem)
+        self.assertIn(("ns", cache._hash_key("a")), cache._mem)
+
+    def test_evicted_entry_is_reloaded_from_disk(self):
+        cache = self._manager(memory_size=1)
+        cache.save("ns", "a", {"value": 1})
+        cache.save("ns", "b", {"value": 2})
+
+        self.assertEqual(cache.load("ns", "a"), {"value": 1})
+
+
+class DeferredSaveTest(CacheTestCase):
+    def test_entry_is_written_only_on_flush(self):
+        cache = self._manager(flush_interval=60)
+        cache.save_deferred("ns", "a", [1, 2])
+        path = cache._path("ns", "a")
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(cache.load("ns", "a"), [1, 2])  # served from memory meanwhile
+
+        cache.flush()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(self._manager().load("ns", "a"), [1, 2])
+
+    def test_unserialisable_entry_does_not_drop_the_batch(self):
+        cache = self._manager(flush_interval=60)
+        cache.save_deferred("ns", "bad", object())
+        cache.save_deferred("ns", "good", "ok")
+
+        with self.assertLogs("utils.cache", level="WARNING"):
+            cache.flush()
+
+        self.assertFalse(os.path.exists(cache._path("ns", "bad")))
+        self.assertEqual(self._manager().load("ns", "good"), "ok")
+
+
+class CompressedCacheTest(CacheTestCase):
+    def test_round_trip_writes_gzip(self):
+        cache = self._manager(compress=True)
+        path = cache.save("ns", "a", {"value": 1})
+
+        self.assertTrue(path.endswith(".json.gz"))
+        with open(path, "rb") as fh:
+            self.assertEqual(fh.read(2), b"\x1f\x8b")
+        self.assertEqual(self._manager(compress=True).load("ns", "a"), {"value": 1})
+
+    def test_legacy_plain_json_entry_is_read(self):
+        plain = self._manager()
+        legacy_path = plain.save("ns", "a", {"value": 1})
+
+        cache = self._manager(compress=True)
+        self.assertEqual(cache.load("ns", "a"), {"value": 1})
+
+        cache.invalidate("ns", "a")
+        self.assertFalse(os.path.exists(legacy_path))
+
+
+class MemoryExpiryTest(CacheTestCase):
+    def _fill(self, cache: CacheManager, count: int, start: int = 0) -> None:
+        for i in range(start, start + count):
+            cache.save("ns", f"k{i}", i)
+
+    def test_sweep_drops_expired_entries(self):
+        cache = self._manager(memory_ttl=60)
+        with mock.patch("utils.cache.time.time", return_value=time.time() - 3600):
+            self._fill(cache, 10)
+        self.assertEqual(len(cache._mem), 10)
+
+        self._fill(cache, CacheManager._SWEEP_EVERY - 10, start=10)  # this put triggers the sweep
+
+        self.assertEqual(len(cache._mem), CacheManager._SWEEP_EVERY - 10)
+        self.assertNotIn(("ns", cache._hash_key("k0")), cache._mem)
+        self.assertEqual(cache.load("ns", "k0", ttl=None), 0)  # disk copy is untouched
+
+    def test_resaved_key_survives_its_stale_heap_record(self):
+        cache = self._manager(memory_ttl=60)
+        with mock.patch("utils.cache.time.time", return_value=time.time() - 3600):
+            cache.save("ns", "k0", "old")
+        cache.save("ns", "k0", "new")
+
+        self._fill(cache, CacheManager._SWEEP_EVERY, start=1)
+
+        self.assertIn(("ns", cache._hash_key("k0")), cache._mem)
+        self.assertEqual(cache.load("ns", "k0"), "new")
+
+    def test_no_memory_ttl_keeps_entries_until_evicted(self):
+        cache = self._manager(memory_ttl=None)
+        with mock.patch("utils.cache.time.time", return_value=time.time() - 3600):
+            self._fill(cache, CacheManager._SWEEP_EVERY + 1)
+
+        self.assertEqual(len(cache._mem), CacheManager._SWEEP_EVERY + 1)
+        self.assertEqual(cache._exp_heap, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
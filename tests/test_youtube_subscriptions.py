@@ -0,0 +1,198 @@
+import argparse
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+import youtube_subscriptions
+from tests.helpers import api_response
+from utils import QuotaTracker, create_session
+
+
+_RATE_LIMITED = b'{"error": {"errors": [{"reason": "rateLimitExceeded"}]}}'
+
+
+def _response(status_code: int) -> requests.Response:
+    return api_response(status_code, _RATE_LIMITED)
+
+
+def _feed(*entries: bytes) -> bytes:
+    return (
+        b'<?xml version="1.0" encoding="UTF-8"?>'
+        b'<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">'
+        b"<title>Channel</title>" + b"".join(entries) + b"</feed>"
+    )
+
+
+def _entry(video_id: str, published: str, title: str = "Video", author: bytes = b"<name>Channel</name>", attrs: bytes = b"") -> bytes:
+    return (
+        b"<entry" + attrs + b">"
+        b"<id>yt:video:" + video_id.encode() + b"</id>"
+        b"<yt:videoId>" + video_id.encode() + b"</yt:videoId>"
+        b"<title>" + title.encode() + b"</title>"
+        b"<author>" + author + b"</author>"
+        b"<published>" + published.encode() + b"</published>"
+        b"</entry>"
+    )
+
+
+class _TooManyRequests(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(429)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SessionRetryTest(unittest.TestCase):
+    def test_exhausted_retries_return_the_last_response(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _TooManyRequests)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        session = create_session(retries=1, backoff_factor=0)
+        session.mount("http://", session.adapters["https://"])  # exercise the retrying adapter locally
+        response = session.get(f"http://127.0.0.1:{server.server_port}/", timeout=5)
+
+        self.assertEqual(response.status_code, 429)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            response.raise_for_status()
+
+
+class SearchFallbackTest(unittest.TestCase):
+    def test_rate_limited_search_falls_back_to_uploads(self):
+        uploads = [{"id": {"videoId": "abc"}, "snippet": {"title": "t"}}]
+        quota = QuotaTracker(daily_limit=10000)
+        published_after = datetime.now(timezone.utc) - timedelta(days=7)
+
+        with mock.patch.object(youtube_subscriptions.SESSION, "get", return_value=_response(429)), \
+                mock.patch.object(youtube_subscriptions, "get_channel_uploads", return_value=uploads) as fallback, \
+                mock.patch.object(youtube_subscriptions, "get_rss_videos") as rss:
+            result = youtube_subscriptions.search_channel_videos(
+                "token", "UC123", published_after, 5, use_cache=False, quota=quota
+            )
+
+        self.assertEqual(result, uploads)
+        fallback.assert_called_once()
+        rss.assert_not_called()
+        # The failed search.list call is not billed
+        self.assertEqual(quota.used, 0)
+
+    def test_forbidden_search_propagates_to_caller(self):
+        quota = QuotaTracker(daily_limit=10000)
+        published_after = datetime.now(timezone.utc) - timedelta(days=7)
+
+        with mock.patch.object(youtube_subscriptions.SESSION, "get", return_value=_response(403)), \
+                mock.patch.object(youtube_subscriptions, "get_channel_uploads") as fallback:
+            with self.assertRaises(requests.exceptions.HTTPError):
+                youtube_subscriptions.search_channel_videos(
+                    "token", "UC123", published_after, 5, use_cache=False, quota=quota
+                )
+
+        fallback.assert_not_called()
+        self.assertEqual(quota.used, 0)
+
+
+class CollectVideosTest(unittest.TestCase):
+    def test_repeated_403s_switch_to_rss_only(self):
+        subscriptions = [
+            {"snippet": {"title": f"Channel {i}", "resourceId": {"channelId": f"UC{i}"}}} for i in range(4)
+        ]
+        args = argparse.Namespace(rss_fallback=False, no_cache=True, videos_per_channel=5, batch_size=2)
+        forbidden = requests.exceptions.HTTPError(response=_response(403))
+
+        with mock.patch.object(youtube_subscriptions, "get_uploads_playlists"), \
+                mock.patch.object(youtube_subscriptions, "search_channel_videos", side_effect=forbidden) as search, \
+                mock.patch.object(youtube_subscriptions, "get_rss_videos", side_effect=lambda cid, **kw: [cid]) as rss:
+            videos = youtube_subscriptions._collect_videos(
+                "token", subscriptions, datetime.now(timezone.utc), args, QuotaTracker(daily_limit=10000)
+            )
+
+        # First batch: both searches 403 and each channel is read from RSS; the second batch skips search
+        self.assertEqual(search.call_count, 2)
+        self.assertEqual(rss.call_count, 4)
+        self.assertEqual(videos, ["UC0", "UC1", "UC2", "UC3"])
+
+
+class RssEntriesTest(unittest.TestCase):
+    def test_regular_feed_uses_regex_fast_path(self):
+        content = _feed(
+            _entry("a1", "2026-10-10T12:00:00+00:00", title="Q&amp;A"),
+            _entry("b2", "2026-10-09T12:00:00+00:00"),
+        )
+        with mock.patch.object(youtube_subscriptions.ET, "iterparse") as iterparse:
+            entries = list(youtube_subscriptions._iter_rss_entries(content))
+
+        iterparse.assert_not_called()
+        self.assertEqual(
+            entries,
+            [
+                ("a1", "Q&A", "Channel", "2026-10-10T12:00:00+00:00"),
+                ("b2", "Video", "Channel", "2026-10-09T12:00:00+00:00"),
+            ],
+        )
+
+    def test_entry_without_author_name_falls_back_to_elementtree(self):
+        content = _feed(_entry("a1", "2026-10-10T12:00:00+00:00", author=b""))
+
+        entries = list(youtube_subscriptions._iter_rss_entries(content))
+
+        self.assertEqual(entries, [("a1", "Video", "Unknown", "2026-10-10T12:00:00+00:00")])
+
+    def test_entry_with_attributes_falls_back_to_elementtree(self):
+        content = _feed(
+            _entry("a1", "2026-10-10T12:00:00+00:00", attrs=b' xml:lang="en"'),
+            _entry("b2", "2026-10-09T12:00:00+00:00"),
+        )
+
+        entries = list(youtube_subscriptions._iter_rss_entries(content))
+
+        self.assertEqual([entry[0] for entry in entries], ["a1", "b2"])
+
+    def test_scan_stops_at_first_entry_before_cutoff(self):
+        content = _feed(
+            _entry("new", "2026-10-10T12:00:00+00:00"),
+            _entry("old", "2026-10-01T12:00:00+00:00"),
+            _entry("out-of-order", "2026-10-11T12:00:00+00:00"),
+        )
+        cutoff = datetime(2026, 10, 5, tzinfo=timezone.utc)
+
+        with mock.patch.object(youtube_subscriptions.SESSION, "get", return_value=api_response(200, content)):
+            videos = youtube_subscriptions.get_rss_videos("UC0", cutoff, max_results=10)
+
+        self.assertEqual([video["id"]["videoId"] for video in videos], ["new"])
+
+
+class PublishedBeforeTest(unittest.TestCase):
+    CUTOFF = datetime(2026, 10, 5, 12, tzinfo=timezone.utc)
+
+    def _before(self, published: str, cutoff: str) -> bool:
+        return youtube_subscriptions._published_before(published, cutoff, self.CUTOFF.timestamp())
+
+    def test_same_layout_strings_compare_without_parsing(self):
+        with mock.patch.object(youtube_subscriptions, "_parse_iso") as parse:
+            self.assertTrue(self._before("2026-10-05T11:59:59Z", "2026-10-05T12:00:00Z"))
+            self.assertFalse(self._before("2026-10-05T12:00:00Z", "2026-10-05T12:00:00Z"))
+            self.assertTrue(self._before("2026-10-05T11:59:59+00:00", "2026-10-05T12:00:00+00:00"))
+            self.assertFalse(self._before("2026-10-06T00:00:00+00:00", "2026-10-05T12:00:00+00:00"))
+        parse.assert_not_called()
+
+    def test_mixed_suffixes_are_parsed(self):
+        self.assertTrue(self._before("2026-10-05T11:59:59+00:00", "2026-10-05T12:00:00Z"))
+        self.assertFalse(self._before("2026-10-05T12:00:01Z", "2026-10-05T12:00:00+00:00"))
+
+    def test_fractional_seconds_and_offsets_are_parsed(self):
+        self.assertTrue(self._before("2026-10-05T11:59:59.500Z", "2026-10-05T12:00:00Z"))
+        self.assertFalse(self._before("2026-10-05T12:00:00.500Z", "2026-10-05T12:00:00Z"))
+        # Same length as the cutoff but a non-UTC offset: 13:30+02:00 is 11:30 UTC
+        self.assertTrue(self._before("2026-10-05T13:30:00+02:00", "2026-10-05T12:00:00+00:00"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import yt_subscription_podcasts
+from tests.helpers import api_response
+from utils import QuotaTracker
+
+
+class SearchFallbackTest(unittest.TestCase):
+    def test_rate_limited_search_falls_back_to_rss(self):
+        episodes = [{"id": {"videoId": "abc"}, "snippet": {"title": "Episode 1"}}]
+        quota = QuotaTracker(daily_limit=10000)
+        published_after = datetime.now(timezone.utc) - timedelta(days=7)
+
+        with mock.patch.object(yt_subscription_podcasts.SESSION, "get", return_value=api_response(429)), \
+                mock.patch.object(yt_subscription_podcasts, "get_rss_podcasts", return_value=episodes) as rss:
+            result = yt_subscription_podcasts.search_channel_podcasts(
+                "token", "UC123", published_after, 5, use_cache=False, rss_only=False, quota=quota
+            )
+
+        self.assertEqual(result, episodes)
+        rss.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,15 +5,23 @@ Searches for popular channels and ranks them by subscriber count.
 """
 
 import argparse
+import atexit
 import csv
+import hashlib
 import json
 import os
 import sys
-from datetime import datetime, timedelta, timezone
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
 
-import requests
 from dotenv import load_dotenv
+import requests
+
+from utils import QuotaLimitError, QuotaTracker, create_session, serialization
 
 YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
 
@@ -26,6 +34,24 @@ SAFETY_BUFFER = 500  # reserve some quota for safety
 # Cache settings
 CACHE_DIR = ".cache"
 CACHE_EXPIRY_HOURS = 24  # Cache expires after 24 hours
+CACHE_INDEX_PATH = os.path.join(CACHE_DIR, "index.json")
+
+# Request parameters that never change between calls
+_CHANNEL_SEARCH_BASE_PARAMS = {"part": "snippet", "type": "channel", "order": "relevance"}
+_CHANNEL_DETAILS_BASE_PARAMS = {"part": "snippet,statistics"}
+
+MAX_WORKERS = 10  # concurrent channel detail requests
+
+# Shared keep-alive session for all googleapis.com calls
+SESSION = create_session()
+
+# Manifest of cache save times, read once and written back at exit
+_CACHE_INDEX: Optional[Dict[str, float]] = None
+_CACHE_INDEX_DIRTY = False
+_CACHE_INDEX_LOCK = threading.Lock()
+
+# Set once CACHE_DIR is known to exist, so cache lookups skip the makedirs stat
+_CACHE_DIR_READY = False
 
 
 def get_api_key() -> str:
@@ -37,103 +63,166 @@ def get_api_key() -> str:
     return api_key
 
 
+def _ensure_cache_dir() -> None:
+    """Create CACHE_DIR on first use in this process."""
+    global _CACHE_DIR_READY
+    if not _CACHE_DIR_READY:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _CACHE_DIR_READY = True
+
+
 def get_cache_path(cache_key: str, endpoint: str) -> str:
     """Get the file path for a cache entry."""
-    os.makedirs(CACHE_DIR, exist_ok=True)
+    _ensure_cache_dir()
     return os.path.join(CACHE_DIR, f"{endpoint}_{cache_key}.json")
 
 
+def _cache_index() -> Dict[str, float]:
+    """Return the cache manifest (file name -> save time), loading it on first use."""
+    global _CACHE_INDEX
+    with _CACHE_INDEX_LOCK:
+        if _CACHE_INDEX is None:
+            try:
+                with open(CACHE_INDEX_PATH, 'rb') as f:
+                    _CACHE_INDEX = serialization.loads(f.read())
+            except (FileNotFoundError, ValueError):
+                _CACHE_INDEX = {}
+            atexit.register(_write_cache_index)
+        return _CACHE_INDEX
+
+
+def _touch_cache_index(cache_path: str) -> None:
+    """Record that a cache file was (re)validated just now."""
+    global _CACHE_INDEX_DIRTY
+    _cache_index()[os.path.basename(cache_path)] = time.time()
+    _CACHE_INDEX_DIRTY = True
+
+
+def _write_cache_index() -> None:
+    """Persist the cache manifest if it changed during this run."""
+    if not _CACHE_INDEX_DIRTY or _CACHE_INDEX is None:
+        return
+    try:
+        _ensure_cache_dir()
+        with open(CACHE_INDEX_PATH, 'wb') as f:
+            f.write(serialization.dumps(_CACHE_INDEX))
+    except OSError as e:
+        print(f"Warning: Failed to save cache index: {e}")
+
+
 def is_cache_valid(cache_path: str) -> bool:
-    """Check if cache file exists and is not expired."""
-    if not os.path.exists(cache_path):
-        return False
+    """Check if cache entry exists and is not expired."""
+    saved_at = _cache_index().get(os.path.basename(cache_path))
+    if saved_at is None:
+        # Not in the manifest (e.g. written by an older version); fall back to mtime
+        try:
+            saved_at = os.path.getmtime(cache_path)
+        except OSError:
+            return False
     
-    file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_path))
-    return file_age.total_seconds() < (CACHE_EXPIRY_HOURS * 3600)
+    return time.time() - saved_at < (CACHE_EXPIRY_HOURS * 3600)
 
 
 def load_from_cache(cache_path: str) -> Optional[Dict]:
-    """Load data from cache file."""
+    """Load a cache entry ({"etag": ..., "body": ...}) from file."""
     try:
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        with open(cache_path, 'rb') as f:
+            entry = serialization.loads(f.read())
+    except (FileNotFoundError, ValueError):
         return None
+    
+    # Entries written before ETags were stored hold the bare response body
+    if not isinstance(entry, dict) or "body" not in entry:
+        return {"etag": None, "body": entry}
+    return entry
 
 
-def save_to_cache(cache_path: str, data: Dict) -> None:
-    """Save data to cache file."""
+def save_to_cache(cache_path: str, data: Dict, etag: Optional[str] = None) -> None:
+    """Save response body and its ETag to cache file."""
     try:
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(cache_path, 'wb') as f:
+            f.write(serialization.dumps({"etag": etag, "body": data}))
+        _touch_cache_index(cache_path)
     except Exception as e:
         print(f"Warning: Failed to save cache: {e}")
 
 
-def cached_api_request(url: str, params: Dict, endpoint: str, quota_tracker: Optional[Dict[str, int]] = None, no_cache: bool = False) -> Dict:
-    """Make API request with caching."""
+def cached_api_request(url: str, params: Dict, endpoint: str, quota_tracker: Optional[QuotaTracker] = None, no_cache: bool = False) -> Dict:
+    """Make API request with caching and ETag revalidation."""
     if no_cache:
-        resp = requests.get(url, params=params, timeout=30)
+        resp = SESSION.get(url, params=params, timeout=30)
         resp.raise_for_status()
-        return resp.json()
+        return serialization.loads(resp.content)
     
-    # Create cache key from parameters (excluding API key)
-    cache_params = {k: v for k, v in params.items() if k != 'key'}
-    cache_key = str(hash(str(sorted(cache_params.items()))))
+    # Create a stable cache key from parameters (excluding API key); the builtin
+    # hash() is salted per process and would miss the cache on every run
+    cache_params = {k: str(v) for k, v in params.items() if k != 'key'}
+    cache_key = hashlib.blake2b(json.dumps(cache_params, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
     cache_path = get_cache_path(cache_key, endpoint)
     
-    # Try to load from cache first
-    if is_cache_valid(cache_path):
-        cached_data = load_from_cache(cache_path)
-        if cached_data:
-            print(f"Using cached data for {endpoint}")
-            if quota_tracker:
-                quota_tracker["saved"] = quota_tracker.get("saved", 0) + 1
-            return cached_data
+    cached_entry = load_from_cache(cache_path)
+    if cached_entry and cached_entry["body"] and is_cache_valid(cache_path):
+        print(f"Using cached data for {endpoint}")
+        if quota_tracker:
+            quota_tracker.record_saved()
+        return cached_entry["body"]
+    
+    # Revalidate an expired entry with If-None-Match when we have its ETag
+    headers = {}
+    if cached_entry and cached_entry.get("etag"):
+        headers["If-None-Match"] = cached_entry["etag"]
     
     # Make API request
-    resp = requests.get(url, params=params, timeout=30)
+    resp = SESSION.get(url, params=params, headers=headers, timeout=30)
+    if resp.status_code == 304 and cached_entry:
+        print(f"Cached data for {endpoint} not modified")
+        _touch_cache_index(cache_path)
+        return cached_entry["body"]
     resp.raise_for_status()
     
-    data = resp.json()
+    data = serialization.loads(resp.content)
     
     # Save to cache
-    save_to_cache(cache_path, data)
+    save_to_cache(cache_path, data, resp.headers.get("ETag"))
     
     return data
 
 
-def search_channels(api_key: str, query: str, max_results: int, quota_tracker: Optional[Dict[str, int]] = None, no_cache: bool = False) -> List[Dict]:
+def _no_charge(units: int) -> None:
+    """Stand-in for QuotaTracker.charge/refund when quota tracking is disabled."""
+
+
+def search_channels(api_key: str, query: str, max_results: int, quota_tracker: Optional[QuotaTracker] = None, no_cache: bool = False) -> List[Dict]:
     """Search for channels by query."""
     url = f"{YOUTUBE_API_BASE}/search"
     params = {
+        **_CHANNEL_SEARCH_BASE_PARAMS,
         "key": api_key,
-        "part": "snippet",
-        "type": "channel",
         "q": query,
         "maxResults": min(max_results, 50),  # API limit
-        "order": "relevance"
     }
     
     channels = []
     next_page_token = None
+    charge = quota_tracker.charge if quota_tracker else _no_charge
+    refund = quota_tracker.refund if quota_tracker else _no_charge
     
     while len(channels) < max_results:
         if next_page_token:
             params["pageToken"] = next_page_token
         
-        # Check quota
-        if quota_tracker:
-            estimated_cost = SEARCH_QUOTA_COST
-            if quota_tracker.get("used", 0) + estimated_cost > DAILY_QUOTA_LIMIT - SAFETY_BUFFER:
-                print(f"Quota limit reached. Used: {quota_tracker.get('used', 0)}")
-                break
-        
-        data = cached_api_request(url, params, "search", quota_tracker, no_cache)
+        # Check and reserve quota
+        try:
+            charge(SEARCH_QUOTA_COST)
+        except QuotaLimitError as e:
+            print(f"Quota limit reached. {e}")
+            break
         
-        # Track quota usage
-        if quota_tracker:
-            quota_tracker["used"] = quota_tracker.get("used", 0) + SEARCH_QUOTA_COST
+        try:
+            data = cached_api_request(url, params, "search", quota_tracker, no_cache)
+        except requests.RequestException:
+            refund(SEARCH_QUOTA_COST)  # failed calls don't count against the budget
+            raise
         
         items = data.get("items", [])
         channels.extend(items)
@@ -148,35 +237,45 @@ def search_channels(api_key: str, query: str, max_results: int, quota_tracker: O
     return channels[:max_results]
 
 
-def get_channel_details(api_key: str, channel_ids: List[str], quota_tracker: Optional[Dict[str, int]] = None, no_cache: bool = False) -> List[Dict]:
+def get_channel_details(api_key: str, channel_ids: List[str], quota_tracker: Optional[QuotaTracker] = None, no_cache: bool = False) -> List[Dict]:
     """Get detailed statistics for channels."""
     url = f"{YOUTUBE_API_BASE}/channels"
-    results = []
+    chunks = []
+    charge = quota_tracker.charge if quota_tracker else _no_charge
+    refund = quota_tracker.refund if quota_tracker else _no_charge
     
-    # Process in chunks of 50 (API limit)
+    # Process in chunks of 50 (API limit), reserving quota up front
     for i in range(0, len(channel_ids), 50):
         chunk = channel_ids[i:i+50]
         
-        # Check quota
-        if quota_tracker:
-            estimated_cost = CHANNEL_DETAILS_QUOTA_COST * len(chunk)
-            if quota_tracker.get("used", 0) + estimated_cost > DAILY_QUOTA_LIMIT - SAFETY_BUFFER:
-                print(f"Quota limit reached. Used: {quota_tracker.get('used', 0)}")
-                break
-        
-        params = {
-            "key": api_key,
-            "part": "snippet,statistics",
-            "id": ",".join(chunk)
-        }
-        
-        data = cached_api_request(url, params, "channels", quota_tracker, no_cache)
-        
-        # Track quota usage
-        if quota_tracker:
-            quota_tracker["used"] = quota_tracker.get("used", 0) + CHANNEL_DETAILS_QUOTA_COST * len(chunk)
+        # Check and reserve quota
+        try:
+            charge(CHANNEL_DETAILS_QUOTA_COST * len(chunk))
+        except QuotaLimitError as e:
+            print(f"Quota limit reached. {e}")
+            break
         
-        results.extend(data.get("items", []))
+        chunks.append(chunk)
+    
+    base_params = {**_CHANNEL_DETAILS_BASE_PARAMS, "key": api_key}
+    
+    def fetch_chunk(chunk: List[str]) -> List[Dict]:
+        params = {**base_params, "id": ",".join(chunk)}
+        try:
+            data = cached_api_request(url, params, "channels", quota_tracker, no_cache)
+        except requests.RequestException:
+            refund(CHANNEL_DETAILS_QUOTA_COST * len(chunk))  # reserved when the chunk was queued
+            raise
+        return data.get("items", [])
+    
+    # Chunks are independent, so fetch them concurrently over the shared session
+    results = []
+    # (submit, not map: map cancels queued chunks on the first error, and a cancelled
+    # chunk would never refund the quota reserved for it)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(fetch_chunk, chunk) for chunk in chunks]
+        for future in futures:
+            results.extend(future.result())
     
     return results
 
@@ -189,16 +288,17 @@ def human_int(n: Optional[str]) -> int:
         return 0
 
 
+# Thresholds for human-readable counts, and the suffix used at or above each
+COUNT_THRESHOLDS = (1_000, 1_000_000, 1_000_000_000)
+COUNT_SUFFIXES = ("", "K", "M", "B")
+
+
 def format_subscriber_count(count: int) -> str:
     """Format subscriber count in human-readable format."""
-    if count >= 1_000_000_000:
-        return f"{count / 1_000_000_000:.1f}B"
-    elif count >= 1_000_000:
-        return f"{count / 1_000_000:.1f}M"
-    elif count >= 1_000:
-        return f"{count / 1_000:.1f}K"
-    else:
+    i = bisect_right(COUNT_THRESHOLDS, count)
+    if not i:
         return str(count)
+    return f"{count / COUNT_THRESHOLDS[i - 1]:.1f}{COUNT_SUFFIXES[i]}"
 
 
 def assemble_channel_results(channel_items: List[Dict]) -> List[Dict]:
@@ -212,27 +312,27 @@ def assemble_channel_results(channel_items: List[Dict]) -> List[Dict]:
             continue
         
         seen_channel_ids.add(channel_id)
-        snippet = channel.get("snippet", {})
-        stats = channel.get("statistics", {})
+        snippet_get = channel.get("snippet", {}).get
+        stats_get = channel.get("statistics", {}).get
         
-        subscriber_count = human_int(stats.get("subscriberCount"))
-        view_count = human_int(stats.get("viewCount"))
-        video_count = human_int(stats.get("videoCount"))
+        description = snippet_get("description", "")
+        if len(description) > 200:
+            description = description[:200] + "..."
         
         assembled.append({
             "channelId": channel_id,
-            "title": snippet.get("title", ""),
-            "description": snippet.get("description", "")[:200] + "..." if len(snippet.get("description", "")) > 200 else snippet.get("description", ""),
-            "publishedAt": snippet.get("publishedAt", ""),
-            "subscriberCount": subscriber_count,
-            "viewCount": view_count,
-            "videoCount": video_count,
+            "title": snippet_get("title", ""),
+            "description": description,
+            "publishedAt": snippet_get("publishedAt", ""),
+            "subscriberCount": human_int(stats_get("subscriberCount")),
+            "viewCount": human_int(stats_get("viewCount")),
+            "videoCount": human_int(stats_get("videoCount")),
             "url": f"https://www.youtube.com/channel/{channel_id}",
-            "customUrl": snippet.get("customUrl", ""),
+            "customUrl": snippet_get("customUrl", ""),
         })
     
     # Sort by subscriber count (descending)
-    return sorted(assembled, key=lambda x: x["subscriberCount"], reverse=True)
+    return sorted(assembled, key=itemgetter("subscriberCount"), reverse=True)
 
 
 def print_table(rows: List[Dict], limit: int) -> None:
@@ -266,8 +366,8 @@ def write_csv(rows: List[Dict], path: str, limit: int) -> None:
 
 def write_json(rows: List[Dict], path: str, limit: int) -> None:
     """Write results to JSON file."""
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(rows[:limit], f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(serialization.dumps(rows[:limit], indent=True))
 
 
 def write_markdown(rows: List[Dict], path: str, limit: int) -> None:
@@ -306,9 +406,12 @@ def parse_args() -> argparse.Namespace:
 
 def clear_cache() -> None:
     """Clear all cached data."""
+    global _CACHE_DIR_READY
     if os.path.exists(CACHE_DIR):
         import shutil
         shutil.rmtree(CACHE_DIR)
+        _CACHE_DIR_READY = False
+        _cache_index().clear()
         print("Cache cleared.")
 
 
@@ -323,7 +426,7 @@ def main():
     api_key = args.api_key or get_api_key()
     
     # Initialize quota tracker
-    quota_tracker = {"used": 0, "saved": 0}
+    quota_tracker = QuotaTracker(daily_limit=DAILY_QUOTA_LIMIT, safety_buffer=SAFETY_BUFFER)
     
     # Calculate estimated quota usage
     estimated_search_requests = (args.max_results + 49) // 50
@@ -353,7 +456,7 @@ def main():
         return 0
     
     # Get channel IDs
-    channel_ids = [item["snippet"]["channelId"] for item in search_results if "channelId" in item["snippet"]]
+    channel_ids = [cid for item in search_results if (cid := item.get("snippet", {}).get("channelId"))]
     print(f"Extracting details for {len(channel_ids)} channels...")
     
     # Get detailed channel information
@@ -363,9 +466,9 @@ def main():
     # Process and sort results
     results = assemble_channel_results(channel_details)
     
-    print(f"\nFinal quota usage: {quota_tracker['used']} units")
-    if quota_tracker.get('saved', 0) > 0:
-        print(f"Quota saved by caching: {quota_tracker['saved']} units")
+    print(f"\nFinal quota usage: {quota_tracker.used} units")
+    if quota_tracker.saved > 0:
+        print(f"Quota saved by caching: {quota_tracker.saved} units")
     
     # Display results
     print_table(results, args.top)
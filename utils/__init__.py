@@ -1,12 +1,14 @@
 """Shared utility modules for the youtube_most_popular project."""
 
 from .cache import CacheManager, CacheTTL
+from .http import create_session
 from .logging import get_logger, setup_logging
 from .quota import QuotaLimitError, QuotaTracker
 
 __all__ = [
     "CacheManager",
     "CacheTTL",
+    "create_session",
     "get_logger",
     "setup_logging",
     "QuotaLimitError",
@@ -1,13 +1,38 @@
 from __future__ import annotations
 
-import json
+import atexit
+import gzip
 import hashlib
+import heapq
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import serialization
+
+# Plain getLogger: the library must not configure logging on import
+logger = logging.getLogger(__name__)
+
+
+# One fixed algorithm: file names must not depend on which optional packages are
+# installed, or switching environments would orphan every entry. Keys are short, so
+# BLAKE2b's speed is plenty (32 hex chars, the same length as the old MD5 names).
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _hashed_name(key_material: str, prefix: str) -> str:
+    # Pure function of its inputs; the same keys recur many times per run
+    return f"{prefix}{_digest(key_material.encode('utf-8'))}"
 
 
 class CacheTTL(Enum):
@@ -23,19 +48,22 @@ class CacheTTL(Enum):
 class CacheEntry:
     """Metadata stored alongside cached payloads."""
 
-    timestamp: datetime
+    timestamp: float  # POSIX epoch seconds
     payload: Any
 
     @classmethod
     def load(cls, content: dict) -> "CacheEntry":
+        timestamp = content["timestamp"]
+        if isinstance(timestamp, str):  # legacy ISO-8601 entries
+            timestamp = datetime.fromisoformat(timestamp).timestamp()
         return cls(
-            timestamp=datetime.fromisoformat(content["timestamp"]),
+            timestamp=float(timestamp),
             payload=content["data"],
         )
 
     def dump(self) -> dict:
         return {
-            "timestamp": self.timestamp.astimezone(timezone.utc).isoformat(),
+            "timestamp": self.timestamp,
             "data": self.payload,
         }
 
@@ -52,61 +80,251 @@ def _normalize_ttl(ttl: Optional[Union[CacheTTL, timedelta, int, float]]) -> Opt
     raise TypeError(f"Unsupported TTL type: {type(ttl)!r}")
 
 
+# Seconds for the predefined durations, so the common load() path skips timedelta math
+_TTL_SECONDS = {member: member.value.total_seconds() for member in CacheTTL}
+
+
+def _ttl_seconds(ttl: Optional[Union[CacheTTL, timedelta, int, float]]) -> Optional[float]:
+    seconds = _TTL_SECONDS.get(ttl) if isinstance(ttl, CacheTTL) else None
+    if seconds is not None:
+        return seconds
+    ttl_delta = _normalize_ttl(ttl)
+    return ttl_delta.total_seconds() if ttl_delta is not None else None
+
+
+def _iter_json(root: str, recursive: bool = False) -> Iterator[str]:
+    """Yield paths of cache files (`*.json`, `*.json.gz`) under `root` using cached DirEntry types."""
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        yield from _iter_json(entry.path, recursive=True)
+                elif entry.name.endswith((".json", ".json.gz")) and entry.is_file(follow_symlinks=False):
+                    yield entry.path
+    except FileNotFoundError:
+        return
+
+
 class CacheManager:
-    """Filesystem-backed cache for JSON-serialisable payloads."""
+    """Filesystem-backed cache for JSON-serialisable payloads.
+
+    Recently used entries are also kept in a bounded in-memory LRU so repeat
+    lookups within a process skip the disk read and JSON decode. The LRU is
+    per process and per instance; its capacity defaults to the
+    YT_MEM_CACHE_CAP environment variable (4096). In-memory
+    entries older than `memory_ttl` are swept via an expiry min-heap (disk is
+    untouched); `memory_ttl=None` disables that sweep. Entries stored with
+    `save_deferred` are written in batches by `flush`. With `compress=True` files are gzipped (level 1) as `*.json.gz`;
+    existing plain `*.json` entries are still read until rewritten.
+    """
+
+    _SWEEP_EVERY = 64  # inserts between expiry sweeps
 
-    def __init__(self, root: Union[str, os.PathLike[str]]):
+    def __init__(
+        self,
+        root: Union[str, os.PathLike[str]],
+        memory_size: Optional[int] = None,
+        flush_interval: float = 2.0,
+        memory_ttl: Union[CacheTTL, timedelta, int, float] = CacheTTL.DAY,
+        compress: bool = False,
+    ):
         self.root = Path(root)
         self.root.mkdir(parents=True, exist_ok=True)
+        self._root_str = os.fspath(self.root)
+        self._known_dirs = {self._root_str}
+        self._compress = compress
+        self._suffix = ".json.gz" if compress else ".json"
+        self._mem: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._mem_cap = memory_size if memory_size is not None else int(os.getenv("YT_MEM_CACHE_CAP", "4096"))
+        self._mem_lock = threading.Lock()
+        self._mem_ttl = _ttl_seconds(memory_ttl)
+        self._exp_heap: List[Tuple[float, Tuple[str, str]]] = []
+        self._puts_since_sweep = 0
+        self._dirty: Dict[Tuple[str, str], CacheEntry] = {}
+        self._flush_interval = flush_interval
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
 
     def _hash_key(self, key_material: str, prefix: str = "") -> str:
-        digest = hashlib.md5(key_material.encode("utf-8"))
-        return f"{prefix}{digest.hexdigest()}"
+        # Filenames only need 128 bits: 32 hex chars, same length as the old MD5 names
+        return _hashed_name(key_material, prefix)
 
-    def _path(self, namespace: str, key_material: str, prefix: str = "") -> Path:
-        hashed = self._hash_key(key_material, prefix=prefix)
-        return self.root / namespace / f"{hashed}.json"
+    def _hash_keys_bulk(self, keys: Iterable[str], prefix: str = "") -> List[str]:
+        """Hash many keys in one pass (same names as `_hash_key`)."""
+        digest = _digest
+        return [f"{prefix}{digest(k.encode('utf-8'))}" for k in keys]
 
-    def load(self, namespace: str, key_material: str, ttl: Optional[Union[CacheTTL, timedelta, int, float]] = CacheTTL.DAY, prefix: str = "") -> Optional[Any]:
-        path = self._path(namespace, key_material, prefix)
-        if not path.exists():
-            return None
+    def _file_path(self, namespace: str, hashed: str) -> str:
+        # Plain string paths: this runs on every load/save and pathlib joins are costly
+        return f"{self._root_str}{os.sep}{namespace}{os.sep}{hashed}{self._suffix}"
 
+    def _read_entry_bytes(self, namespace: str, hashed: str) -> bytes:
+        path = self._file_path(namespace, hashed)
         try:
-            with path.open("r", encoding="utf-8") as fh:
-                raw = json.load(fh)
-            entry = CacheEntry.load(raw)
-        except (json.JSONDecodeError, KeyError, ValueError):
-            return None
+            with open(path, "rb", buffering=0) as fh:  # raw FileIO: one readall
+                data = fh.read()
+        except FileNotFoundError:
+            if not self._compress:
+                raise
+            # Entry written before compression was enabled
+            with open(path[: -len(".gz")], "rb", buffering=0) as fh:
+                data = fh.read()
+        if data[:2] == b"\x1f\x8b":  # gzip magic
+            data = gzip.decompress(data)
+        return data
 
-        ttl_delta = _normalize_ttl(ttl)
-        if ttl_delta is not None:
-            now = datetime.now(timezone.utc)
-            if now - entry.timestamp > ttl_delta:
+    def _path(self, namespace: str, key_material: str, prefix: str = "") -> str:
+        return self._file_path(namespace, self._hash_key(key_material, prefix=prefix))
+
+    def _mem_get(self, mem_key: Tuple[str, str]) -> Optional[CacheEntry]:
+        with self._mem_lock:
+            entry = self._mem.get(mem_key)
+            if entry is not None:
+                self._mem.move_to_end(mem_key)
+                return entry
+            return self._dirty.get(mem_key)
+
+    def _mem_put(self, mem_key: Tuple[str, str], entry: CacheEntry) -> None:
+        with self._mem_lock:
+            self._mem[mem_key] = entry
+            self._mem.move_to_end(mem_key)
+            if len(self._mem) > self._mem_cap:
+                self._mem.popitem(last=False)
+            if self._mem_ttl is None:  # memory_ttl=None: entries only leave via LRU eviction
+                return
+            heapq.heappush(self._exp_heap, (entry.timestamp + self._mem_ttl, mem_key))
+            self._puts_since_sweep += 1
+            if self._puts_since_sweep >= self._SWEEP_EVERY:
+                self._sweep_expired()
+
+    def _sweep_expired(self) -> None:
+        """Drop expired in-memory entries; caller holds `_mem_lock`."""
+        self._puts_since_sweep = 0
+        now = time.time()
+        heap = self._exp_heap
+        while heap and heap[0][0] <= now:
+            expires_at, mem_key = heapq.heappop(heap)
+            entry = self._mem.get(mem_key)
+            # Skip stale heap records for keys that were re-saved since
+            if entry is not None and entry.timestamp + self._mem_ttl <= now:
+                del self._mem[mem_key]
+        # Records for LRU-evicted or re-saved keys linger; rebuild if they pile up
+        if len(heap) > 2 * self._mem_cap:
+            self._exp_heap = [(e.timestamp + self._mem_ttl, k) for k, e in self._mem.items()]
+            heapq.heapify(self._exp_heap)
+
+    def _mem_discard(self, mem_key: Tuple[str, str]) -> None:
+        with self._mem_lock:
+            self._mem.pop(mem_key, None)
+            self._dirty.pop(mem_key, None)
+
+    def _write_entry(self, namespace: str, hashed: str, entry: CacheEntry) -> str:
+        path = self._file_path(namespace, hashed)
+        directory = os.path.dirname(path)
+        if directory not in self._known_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._known_dirs.add(directory)
+        # Write to a sibling temp file and rename so readers never see a torn file.
+        # No fsync: the API is the source of truth and a lost entry is just refetched.
+        tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        try:
+            with open(tmp, "wb") as fh:
+                data = serialization.dumps(entry.dump())
+                fh.write(gzip.compress(data, compresslevel=1) if self._compress else data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        return path
+
+    def load_entry(self, namespace: str, key_material: str, ttl: Optional[Union[CacheTTL, timedelta, int, float]] = CacheTTL.DAY, prefix: str = "") -> Optional[CacheEntry]:
+        """Like `load`, but return the entry so callers can inspect its age."""
+        hashed = self._hash_key(key_material, prefix=prefix)
+        mem_key = (namespace, hashed)
+        entry = self._mem_get(mem_key)
+        if entry is None:
+            try:
+                entry = CacheEntry.load(serialization.loads(self._read_entry_bytes(namespace, hashed)))
+            except OSError:  # includes FileNotFoundError: let open() report a miss, no stat first
                 return None
+            except (KeyError, ValueError, EOFError):  # decode errors subclass ValueError; EOFError: truncated gzip
+                return None
+            self._mem_put(mem_key, entry)
+
+        ttl_seconds = _ttl_seconds(ttl)
+        if ttl_seconds is not None and time.time() - entry.timestamp > ttl_seconds:
+            return None
 
-        return entry.payload
+        return entry
+
+    def load(self, namespace: str, key_material: str, ttl: Optional[Union[CacheTTL, timedelta, int, float]] = CacheTTL.DAY, prefix: str = "") -> Optional[Any]:
+        entry = self.load_entry(namespace, key_material, ttl, prefix=prefix)
+        return entry.payload if entry is not None else None
 
-    def save(self, namespace: str, key_material: str, payload: Any, prefix: str = "") -> Path:
-        path = self._path(namespace, key_material, prefix)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        entry = CacheEntry(timestamp=datetime.now(timezone.utc), payload=payload)
-        with path.open("w", encoding="utf-8") as fh:
-            json.dump(entry.dump(), fh, ensure_ascii=False, indent=2)
+    def save(self, namespace: str, key_material: str, payload: Any, prefix: str = "") -> str:
+        hashed = self._hash_key(key_material, prefix=prefix)
+        entry = CacheEntry(timestamp=time.time(), payload=payload)
+        path = self._write_entry(namespace, hashed, entry)
+        with self._mem_lock:
+            self._dirty.pop((namespace, hashed), None)
+        self._mem_put((namespace, hashed), entry)
         return path
 
+    def save_deferred(self, namespace: str, key_material: str, payload: Any, prefix: str = "") -> None:
+        """Cache `payload` now and write it to disk with the next batched flush."""
+        mem_key = (namespace, self._hash_key(key_material, prefix=prefix))
+        entry = CacheEntry(timestamp=time.time(), payload=payload)
+        self._mem_put(mem_key, entry)
+        with self._mem_lock:
+            self._dirty[mem_key] = entry
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self._flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Write all pending deferred entries to disk."""
+        with self._mem_lock:
+            pending, self._dirty = self._dirty, {}
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        for (namespace, hashed), entry in pending.items():
+            # One bad entry must not drop the rest of the batch, and this runs on the timer
+            # thread or at exit, where an exception would only print a traceback
+            try:
+                self._write_entry(namespace, hashed, entry)
+            except (OSError, TypeError, ValueError) as exc:  # disk/permission or serialisation errors
+                logger.warning("Failed to write cache entry %s/%s: %s", namespace, hashed, exc)
+
     def invalidate(self, namespace: str, key_material: str, prefix: str = "") -> None:
-        path = self._path(namespace, key_material, prefix)
-        if path.exists():
-            path.unlink()
+        hashed = self._hash_key(key_material, prefix=prefix)
+        self._mem_discard((namespace, hashed))
+        path = self._file_path(namespace, hashed)
+        # Also drop a plain-JSON copy left from before compression was enabled
+        for candidate in (path, path[: -len(".gz")]) if self._compress else (path,):
+            try:
+                os.unlink(candidate)
+            except FileNotFoundError:
+                pass
 
     def clear_namespace(self, namespace: str) -> None:
-        target = self.root / namespace
-        if not target.exists():
-            return
-        for file in target.glob("*.json"):
-            file.unlink()
+        with self._mem_lock:
+            for mem_key in [k for k in self._mem if k[0] == namespace]:
+                del self._mem[mem_key]
+            for mem_key in [k for k in self._dirty if k[0] == namespace]:
+                del self._dirty[mem_key]
+        for path in _iter_json(os.path.join(self._root_str, namespace)):
+            os.unlink(path)
 
     def clear_all(self) -> None:
-        for entry in self.root.glob("**/*.json"):
-            entry.unlink()
+        with self._mem_lock:
+            self._mem.clear()
+            self._exp_heap.clear()
+            self._dirty.clear()
+        for path in _iter_json(self._root_str, recursive=True):
+            os.unlink(path)
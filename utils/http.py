@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import atexit
+from typing import Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def create_session(
+    pool_connections: int = 4,
+    pool_maxsize: int = 32,
+    retries: int = 3,
+    backoff_factor: float = 0.3,
+    status_forcelist: Iterable[int] = RETRY_STATUSES,
+) -> requests.Session:
+    """Return a pooled keep-alive session for googleapis.com calls.
+
+    Transient failures are retried with backoff. Once retries run out the last
+    response is returned, so `raise_for_status()` still yields an `HTTPError`
+    carrying it (not a `RetryError`). The session is closed at exit.
+    Responses are requested gzip-compressed.
+    """
+
+    session = requests.Session()
+    # Google APIs only gzip responses when the User-Agent mentions gzip (Accept-Encoding is already sent)
+    session.headers["User-Agent"] = f"{session.headers.get('User-Agent', 'python-requests')} (gzip)"
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(status_forcelist),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("https://", adapter)
+    atexit.register(session.close)
+    return session
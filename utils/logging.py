@@ -7,6 +7,8 @@ from typing import Optional
 _DEFAULT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
 _DEFAULT_DATEFMT = "%Y-%m-%dT%H:%M:%SZ"
 
+_CONFIGURED = False
+
 
 def setup_logging(level: Optional[str] = None, fmt: str = _DEFAULT_FORMAT, datefmt: str = _DEFAULT_DATEFMT) -> None:
     """Configure root logger.
@@ -14,16 +16,20 @@ def setup_logging(level: Optional[str] = None, fmt: str = _DEFAULT_FORMAT, datef
     Respect `LOG_LEVEL` env var when level is not supplied.
     """
 
+    global _CONFIGURED
     log_level = level or os.getenv("LOG_LEVEL", "INFO").upper()
     logging.basicConfig(level=getattr(logging, log_level, logging.INFO), format=fmt, datefmt=datefmt)
+    _CONFIGURED = True
 
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """Return module-specific logger."""
 
-    if logging.getLogger().handlers:
-        return logging.getLogger(name)
-
-    # Auto-setup if not configured.
-    setup_logging()
+    global _CONFIGURED
+    if not _CONFIGURED:
+        if logging.getLogger().handlers:
+            _CONFIGURED = True  # configured by someone else
+        else:
+            # Auto-setup if not configured.
+            setup_logging()
     return logging.getLogger(name)
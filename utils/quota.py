@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import threading
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Optional
 
 
 class QuotaLimitError(RuntimeError):
@@ -10,35 +12,60 @@ class QuotaLimitError(RuntimeError):
 
 @dataclass
 class QuotaTracker:
-    """Simple quota accounting helper."""
+    """Simple quota accounting helper.
+
+    Updates are serialised with a lock so one tracker can be shared by worker threads.
+    """
 
     daily_limit: int
     safety_buffer: int = 0
     used: int = 0
     saved: int = 0
-    counters: Dict[str, int] = field(default_factory=dict)
+    counters: Counter[str] = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _max: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._max = max(0, self.daily_limit - self.safety_buffer)
 
     def _max_allowed(self) -> int:
-        return max(0, self.daily_limit - self.safety_buffer)
+        return self._max
 
     def can_spend(self, units: int) -> bool:
-        return self.used + units <= self._max_allowed()
+        return self.used + units <= self._max
 
     def ensure_within_limit(self, units: int) -> None:
-        if not self.can_spend(units):
+        if self.used + units > self._max:
             raise QuotaLimitError(
-                f"Quota exceeded: used {self.used}, request {units}, limit {self._max_allowed()}"
+                f"Quota exceeded: used {self.used}, request {units}, limit {self._max}"
             )
 
+    def charge(self, units: int, action: Optional[str] = None) -> None:
+        """Check and reserve `units` in one step, raising QuotaLimitError if over the limit."""
+        with self._lock:
+            self.ensure_within_limit(units)
+            self.used += units
+            if action is not None:
+                self.counters[action] += units
+
     def spend(self, action: str, units: int) -> None:
-        self.ensure_within_limit(units)
-        self.used += units
-        self.counters[action] = self.counters.get(action, 0) + units
+        self.charge(units, action)
+
+    def refund(self, units: int, action: Optional[str] = None) -> None:
+        """Give back units reserved by `charge` for a request that did not complete."""
+        with self._lock:
+            self.used = max(0, self.used - units)
+            if action is not None:
+                self.counters[action] -= units
+                if self.counters[action] <= 0:
+                    del self.counters[action]
 
     def record_saved(self, units: int = 1) -> None:
-        self.saved += units
+        with self._lock:
+            self.saved += units
 
     def reset(self) -> None:
-        self.used = 0
-        self.saved = 0
-        self.counters.clear()
+        with self._lock:
+            self.used = 0
+            self.saved = 0
+            self.counters.clear()
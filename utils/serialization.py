@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:  # Optional C-accelerated codec; stdlib json is used when unavailable.
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialise `obj` to UTF-8 JSON bytes (compact unless `indent`)."""
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str.
+
+    Malformed input raises `ValueError` (both codecs' decode errors subclass it).
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
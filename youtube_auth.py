@@ -11,36 +11,81 @@ This module complies with YouTube API Services Terms and Policies:
 """
 
 import json
+import logging
 import os
 import sys
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
+from urllib.parse import quote, urlencode
 
 import requests
-from dotenv import load_dotenv
-from google_auth_oauthlib.flow import InstalledAppFlow
+
+from utils import create_session, serialization
 
 # OAuth settings
 OAUTH_SCOPE = "https://www.googleapis.com/auth/youtube.readonly"
 OAUTH_REDIRECT_URI = "http://localhost:8080"
 GLOBAL_CACHE_DIR = os.path.expanduser("~/.youtube_scripts_cache")
+TOKEN_REQUEST_TIMEOUT = 10  # seconds
+
+# Authorization URL with the constant parameters pre-encoded; only client_id varies
+_AUTH_URL_TMPL = "https://accounts.google.com/o/oauth2/v2/auth?" + urlencode({
+    "redirect_uri": OAUTH_REDIRECT_URI,
+    "scope": OAUTH_SCOPE,
+    "response_type": "code",
+    "access_type": "offline",
+    "prompt": "consent",
+}) + "&client_id={cid}"
+
+# Keep-alive session for token exchanges; scripts may reuse it for API calls
+SESSION = create_session(pool_connections=4, pool_maxsize=4)
+
+# Plain getLogger: importing this module must not configure logging before the caller's setup_logging()
+logger = logging.getLogger(__name__)
 
 class YouTubeAuth:
     def __init__(self):
         self.cache_dir = GLOBAL_CACHE_DIR
         os.makedirs(self.cache_dir, exist_ok=True)
+        # (path, mtime, (client_id, client_secret)) of the last parsed client secret file
+        self._creds_cache: Optional[Tuple[str, float, Tuple[str, str]]] = None
+        # (access_token, expires_at epoch) so repeat checks skip the file read
+        self._token_memo: Optional[Tuple[str, float]] = None
+    
+    def _find_client_secret_file(self) -> Optional[str]:
+        """Return the first client_secret_*.json in the working directory, if any."""
+        with os.scandir('.') as it:
+            for entry in it:
+                if entry.name.startswith('client_secret_') and entry.name.endswith('.json') and entry.is_file():
+                    return entry.name
+        return None
     
     def get_credentials(self) -> Tuple[str, str]:
         """Get OAuth credentials from JSON file or environment."""
+        # Reuse the parsed file while it is unchanged on disk
+        if self._creds_cache is not None:
+            path, mtime, cached = self._creds_cache
+            try:
+                if os.stat(path).st_mtime == mtime:
+                    return cached
+            except FileNotFoundError:
+                pass
+            self._creds_cache = None
+        
+        from dotenv import load_dotenv  # deferred: only needed when no token is cached
         load_dotenv()
         
         # Try JSON file first
-        json_files = [f for f in os.listdir('.') if f.startswith('client_secret_') and f.endswith('.json')]
-        if json_files:
-            with open(json_files[0], 'r') as f:
-                creds = json.load(f)
+        json_file = self._find_client_secret_file()
+        if json_file:
+            with open(json_file, 'rb', buffering=0) as f:
+                mtime = os.fstat(f.fileno()).st_mtime
+                creds = serialization.loads(f.read())
             client_data = creds.get("installed") or creds.get("web")
-            return client_data["client_id"], client_data["client_secret"]
+            result = (client_data["client_id"], client_data["client_secret"])
+            self._creds_cache = (json_file, mtime, result)
+            return result
         
         # Fallback to env vars
         client_id = os.getenv("YOUTUBE_CLIENT_ID")
@@ -54,26 +99,39 @@ class YouTubeAuth:
     
     def get_cached_token(self) -> Optional[str]:
         """Get cached access token if valid and not expired."""
+        now = time.time()
+        if self._token_memo is not None:
+            access_token, expires_at = self._token_memo
+            if now < expires_at:
+                return access_token
+            self._token_memo = None
+        
         token_file = os.path.join(self.cache_dir, "access_token.json")
-        if os.path.exists(token_file):
-            try:
-                with open(token_file, 'r') as f:
-                    token_data = json.load(f)
-                
-                # Check if token has expired
-                now = datetime.now(timezone.utc)
-                if "expires_at" in token_data:
-                    expires_at = datetime.fromisoformat(token_data["expires_at"])
+        try:
+            with open(token_file, 'rb', buffering=0) as f:
+                token_data = serialization.loads(f.read())
+            
+            # Check if token has expired (epoch seconds)
+            if "expires_at" in token_data:
+                expires_at = token_data["expires_at"]
+                if isinstance(expires_at, str):
+                    # Legacy ISO string: parse once and rewrite in the epoch format
+                    expires_at = datetime.fromisoformat(expires_at).timestamp()
                     if now < expires_at:
-                        return token_data["access_token"]
-                    return None
-                
-                # Fallback to old timestamp-based check (for backward compatibility)
-                token_time = datetime.fromisoformat(token_data["timestamp"])
-                if now - token_time < timedelta(minutes=55):
+                        self._write_token(token_data["access_token"], now, expires_at)
+                if now < expires_at:
+                    self._token_memo = (token_data["access_token"], expires_at)
                     return token_data["access_token"]
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                logger.debug(f"Error reading token cache: {e}")
+                return None
+
+            # Fallback to old timestamp-based check (for backward compatibility)
+            token_time = datetime.fromisoformat(token_data["timestamp"]).timestamp()
+            if now - token_time < timedelta(minutes=55).total_seconds():
+                return token_data["access_token"]
+        except FileNotFoundError:
+            return None
+        except (KeyError, ValueError) as e:
+            logger.debug(f"Error reading token cache: {e}")
         return None
     
     def save_token(self, access_token: str, expires_in: int = 3600):
@@ -83,31 +141,27 @@ class YouTubeAuth:
             access_token: The OAuth access token
             expires_in: Time in seconds until token expires (default: 1 hour)
         """
+        now = time.time()
+        self._write_token(access_token, now, now + expires_in - 300)  # 5 min buffer
+    
+    def _write_token(self, access_token: str, timestamp: float, expires_at: float) -> None:
+        """Persist the token file and refresh the in-memory copy."""
         token_file = os.path.join(self.cache_dir, "access_token.json")
-        now = datetime.now(timezone.utc)
         with open(token_file, 'w') as f:
             json.dump({
                 "access_token": access_token,
-                "timestamp": now.isoformat(),
-                "expires_at": (now + timedelta(seconds=expires_in - 300)).isoformat()  # 5 min buffer
+                "timestamp": timestamp,
+                "expires_at": expires_at
             }, f)
+        self._token_memo = (access_token, expires_at)
     
     def get_auth_url(self, client_id: str) -> str:
         """Generate OAuth authorization URL."""
-        from urllib.parse import urlencode
-        params = {
-            "client_id": client_id,
-            "redirect_uri": OAUTH_REDIRECT_URI,
-            "scope": OAUTH_SCOPE,
-            "response_type": "code",
-            "access_type": "offline",
-            "prompt": "consent"
-        }
-        return f"https://accounts.google.com/o/oauth2/v2/auth?{urlencode(params)}"
+        return _AUTH_URL_TMPL.format(cid=quote(client_id, safe=''))
     
     def exchange_code(self, client_id: str, client_secret: str, auth_code: str) -> str:
         """Exchange authorization code for access token."""
-        response = requests.post("https://oauth2.googleapis.com/token", data={
+        response = SESSION.post("https://oauth2.googleapis.com/token", timeout=TOKEN_REQUEST_TIMEOUT, data={
             "client_id": client_id,
             "client_secret": client_secret,
             "code": auth_code,
@@ -156,6 +210,7 @@ class YouTubeAuth:
     
     def clear_session(self):
         """Clear cached authentication."""
+        self._token_memo = None
         token_file = os.path.join(self.cache_dir, "access_token.json")
         if os.path.exists(token_file):
             os.remove(token_file)
@@ -163,6 +218,9 @@ class YouTubeAuth:
 
     def run_local_server(self) -> str:
         """Automate OAuth via local server (preferred when GUI is available)."""
+        # Deferred: google-auth pulls in a large dependency tree that cached-token runs never need
+        from dotenv import load_dotenv
+        from google_auth_oauthlib.flow import InstalledAppFlow
         load_dotenv()
         creds_path = self._resolve_client_secret_file()
         flow = InstalledAppFlow.from_client_secrets_file(
@@ -179,9 +237,9 @@ class YouTubeAuth:
 
     def _resolve_client_secret_file(self) -> str:
         """Locate client_secret JSON file for automated OAuth."""
-        candidates = [f for f in os.listdir('.') if f.startswith('client_secret_') and f.endswith('.json')]
-        if candidates:
-            return candidates[0]
+        candidate = self._find_client_secret_file()
+        if candidate:
+            return candidate
         explicit = os.getenv("YOUTUBE_CLIENT_SECRET_FILE")
         if explicit and os.path.exists(explicit):
             return explicit
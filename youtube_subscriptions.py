@@ -12,15 +12,35 @@ This script complies with YouTube API Services Terms and Policies:
 """
 
 import argparse
-import json
+import hashlib
+import heapq
+import html
 import os
+import re
 import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from functools import partial
+from io import BytesIO
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 
-from utils import CacheManager, CacheTTL, QuotaLimitError, QuotaTracker, get_logger, setup_logging
+# ISO-8601 parser for API/RSS timestamps: ciso8601 if installed, else stdlib
+# (fromisoformat accepts a trailing "Z" natively from Python 3.11).
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:  # pragma: no cover - depends on environment
+    if sys.version_info >= (3, 11):
+        _parse_iso = datetime.fromisoformat
+    else:
+        def _parse_iso(value: str) -> datetime:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+from utils import CacheManager, CacheTTL, QuotaLimitError, QuotaTracker, create_session, get_logger, serialization, setup_logging
 from youtube_auth import get_youtube_token, get_youtube_token_auto
 
 YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
@@ -33,7 +53,34 @@ DAILY_QUOTA_LIMIT = 10000
 SAFETY_BUFFER = 500
 CHANNELS_QUOTA_COST = 1
 PLAYLIST_ITEMS_QUOTA_COST = 1
-DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) seconds; fail fast, Retry covers transient errors
+RSS_TIMEOUT_SECONDS = 5
+
+# Clark-notation tags for the YouTube Atom feed
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_YT = "{http://www.youtube.com/xml/schemas/2015}"
+_ENTRY_TAG = f"{_ATOM}entry"
+# Fast path for YouTube's fixed feed layout: videoId, title, author name, published per <entry>
+_RSS_ENTRY_RE = re.compile(
+    rb"<entry>.*?<yt:videoId>([^<]+)</yt:videoId>.*?<title>([^<]*)</title>"
+    rb".*?<name>([^<]*)</name>.*?<published>([^<]+)</published>.*?</entry>",
+    re.DOTALL,
+)
+_VALID_SORTS = frozenset({"views", "likes", "comments"})
+# Quota/permission statuses that trigger a fallback instead of an exception
+_FALLBACK_STATUSES = frozenset({403, 429})
+
+# Partial-response mask for subscriptions.list: channel ID and title per item
+_SUBSCRIPTION_FIELDS = "nextPageToken,items(snippet(title,resourceId(channelId)))"
+
+# Partial-response mask for videos.list: only what assemble_results reads, which drops
+# descriptions, thumbnails and tags (most of each item) from the response and the cache
+_VIDEO_DETAIL_FIELDS = (
+    "items(id,snippet(title,channelTitle,publishedAt),statistics(viewCount,likeCount,commentCount))"
+)
+
+MAX_WORKERS = 10  # concurrent video-details fetches
+HTTP_POOL_SIZE = 32  # keep-alive connections; also caps concurrent channel fetches
 
 # Cache and output settings
 OUTPUT_DIR = "subscriptions_output"
@@ -41,36 +88,108 @@ CACHE_DIR = os.path.join(OUTPUT_DIR, ".cache")
 
 
 logger = get_logger(__name__)
-cache_manager = CacheManager(CACHE_DIR)
+cache_manager = CacheManager(CACHE_DIR, compress=True)
+
+# Shared keep-alive session (pooled, retries transient errors) for all API and RSS calls
+SESSION = create_session(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+
+
+# Channel ID -> uploads playlist ID, filled by get_uploads_playlists
+_UPLOADS_PLAYLISTS: Dict[str, str] = {}
 
 
 def _cache_key(*parts: str) -> str:
     return "::".join(parts)
 
 
-def _cache_load(namespace: str, key_parts: List[str], ttl: CacheTTL, use_cache: bool, quota: Optional[QuotaTracker]) -> Optional[Any]:
+def _cache_load(
+    namespace: str,
+    key: str,
+    ttl: CacheTTL,
+    use_cache: bool,
+    quota: Optional[QuotaTracker],
+    saved_units: int = 1,
+) -> Optional[Any]:
+    """Return the cached payload, crediting the quota units the hit avoided."""
     if not use_cache:
         return None
-    payload = cache_manager.load(namespace, _cache_key(*key_parts), ttl)
+    payload = cache_manager.load(namespace, key, ttl)
     if payload is not None and quota is not None:
-        quota.record_saved()
+        quota.record_saved(saved_units)
     return payload
 
 
-def _cache_save(namespace: str, key_parts: List[str], payload: Any) -> None:
-    cache_manager.save(namespace, _cache_key(*key_parts), payload)
+def _cache_save(namespace: str, key: str, payload: Any) -> None:
+    # Visible to loads immediately; the file writes are batched off the fetch threads
+    cache_manager.save_deferred(namespace, key, payload)
+
+
+def _video_chunk_key(video_ids: List[str]) -> str:
+    """Hash a sorted ID chunk incrementally instead of building one long joined string."""
+    digest = hashlib.blake2b(digest_size=8)
+    for vid in video_ids:
+        digest.update(vid.encode("ascii"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _format_published_after(published_after: datetime) -> str:
+    """Format a datetime as the RFC 3339 UTC string the API expects."""
+    return published_after.astimezone(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _get_charged(
+    url: str,
+    headers: Dict[str, str],
+    params: Dict[str, Any],
+    quota: QuotaTracker,
+    units: int,
+    action: str,
+) -> requests.Response:
+    """GET after reserving `units` of quota; the units are refunded if the request fails."""
+    quota.charge(units, action)
+    try:
+        response = SESSION.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        quota.refund(units, action)
+        raise
+    return response
+
+
+def _published_before(published: str, cutoff: str, cutoff_ts: float) -> bool:
+    """True if ISO-8601 `published` is earlier than the cutoff.
+
+    Same-layout UTC strings order like their instants, so the usual case is a plain
+    string compare; anything else is parsed.
+    """
+    if len(published) == len(cutoff) and (
+        published[-1] == cutoff[-1] == "Z" or published[-6:] == cutoff[-6:] == "+00:00"
+    ):
+        return published < cutoff
+    return _parse_iso(published).timestamp() < cutoff_ts
 
 
 def get_subscriptions(access_token: str, max_results: int, use_cache: bool, quota: QuotaTracker) -> List[Dict]:
-    cache_key_parts = ["subscriptions", str(max_results)]
-    cached_data = _cache_load("subscriptions", cache_key_parts, CacheTTL.MONTH, use_cache, quota)
+    cache_key = _cache_key("subscriptions", str(max_results))
+    pages = (max_results + 49) // 50
+    cached_data = _cache_load(
+        "subscriptions", cache_key, CacheTTL.MONTH, use_cache, quota, pages * SUBSCRIPTIONS_QUOTA_COST
+    )
     if cached_data is not None:
         logger.info("Using cached subscriptions")
         return cached_data
     
     url = f"{YOUTUBE_API_BASE}/subscriptions"
     headers = {"Authorization": f"Bearer {access_token}"}
-    params = {"part": "snippet", "mine": "true", "maxResults": min(max_results, 50)}
+    # Page tokens are opaque and only arrive with the previous page, so pages can't be
+    # requested in parallel; trim each one to the fields we read to keep the round trips short.
+    params = {
+        "part": "snippet",
+        "mine": "true",
+        "maxResults": min(max_results, 50),
+        "fields": _SUBSCRIPTION_FIELDS,
+    }
     
     subscriptions = []
     next_page_token = None
@@ -80,11 +199,11 @@ def get_subscriptions(access_token: str, max_results: int, use_cache: bool, quot
             params["pageToken"] = next_page_token
         
         quota.ensure_within_limit(SUBSCRIPTIONS_QUOTA_COST)
-        response = requests.get(url, headers=headers, params=params, timeout=30)
+        response = SESSION.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
         response.raise_for_status()
         quota.spend("subscriptions.list", SUBSCRIPTIONS_QUOTA_COST)
         
-        data = response.json()
+        data = serialization.loads(response.content)
         subscriptions.extend(data.get("items", []))
         
         if len(subscriptions) >= max_results:
@@ -96,7 +215,48 @@ def get_subscriptions(access_token: str, max_results: int, use_cache: bool, quot
     
     result = subscriptions[:max_results]
     if use_cache:
-        _cache_save("subscriptions", cache_key_parts, result)
+        _cache_save("subscriptions", cache_key, result)
+    return result
+
+
+def get_uploads_playlists(
+    access_token: str,
+    channel_ids: Iterable[str],
+    use_cache: bool,
+    quota: QuotaTracker,
+) -> Dict[str, str]:
+    """Map channel IDs to their uploads playlist IDs, 50 channels per channels.list call.
+
+    The mapping never changes, so it is memoized for the run and cached for a month.
+    """
+    result: Dict[str, str] = {}
+    missing: List[str] = []
+    for channel_id in dict.fromkeys(channel_ids):
+        playlist_id = _UPLOADS_PLAYLISTS.get(channel_id)
+        if playlist_id is None and use_cache:
+            playlist_id = cache_manager.load("uploads_playlist", channel_id, CacheTTL.MONTH)
+        if playlist_id is None:
+            missing.append(channel_id)
+        else:
+            result[channel_id] = playlist_id
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    for i in range(0, len(missing), 50):
+        response = _get_charged(
+            f"{YOUTUBE_API_BASE}/channels",
+            headers,
+            {"part": "contentDetails", "id": ",".join(missing[i : i + 50]), "maxResults": 50},
+            quota,
+            CHANNELS_QUOTA_COST,
+            "channels.list",
+        )
+        for item in serialization.loads(response.content).get("items", []):
+            playlist_id = item["contentDetails"]["relatedPlaylists"]["uploads"]
+            result[item["id"]] = playlist_id
+            if use_cache:
+                _cache_save("uploads_playlist", item["id"], playlist_id)
+
+    _UPLOADS_PLAYLISTS.update(result)
     return result
 
 
@@ -107,72 +267,58 @@ def get_channel_uploads(
     max_results: int,
     use_cache: bool,
     quota: QuotaTracker,
+    published_after_str: Optional[str] = None,
 ) -> List[Dict]:
     """Get recent uploads from channel's uploads playlist with caching."""
 
-    published_after_str = (
-        published_after.astimezone(timezone.utc)
-        .isoformat(timespec="seconds")
-        .replace("+00:00", "Z")
+    if published_after_str is None:
+        published_after_str = _format_published_after(published_after)
+    cache_key = _cache_key(channel_id, published_after_str, str(max_results))
+    cached_data = _cache_load(
+        "uploads", cache_key, CacheTTL.WEEK, use_cache, quota, CHANNELS_QUOTA_COST + PLAYLIST_ITEMS_QUOTA_COST
     )
-    cache_key_parts = [channel_id, published_after_str, str(max_results)]
-    cached_data = _cache_load("uploads", cache_key_parts, CacheTTL.WEEK, use_cache, quota)
     if cached_data is not None:
         logger.debug("Using cached uploads for channel %s", channel_id)
         return cached_data
 
     try:
-        url = f"{YOUTUBE_API_BASE}/channels"
         headers = {"Authorization": f"Bearer {access_token}"}
-        params = {"part": "contentDetails", "id": channel_id}
-
-        quota.ensure_within_limit(CHANNELS_QUOTA_COST)
-        response = requests.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT_SECONDS)
-        response.raise_for_status()
-        quota.spend("channels.list", CHANNELS_QUOTA_COST)
-
-        data = response.json()
-        if not data.get("items"):
+        uploads_playlist_id = get_uploads_playlists(access_token, [channel_id], use_cache, quota).get(channel_id)
+        if not uploads_playlist_id:
             return []
 
-        uploads_playlist_id = data["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
-
         params = {
             "part": "snippet",
             "playlistId": uploads_playlist_id,
             "maxResults": min(max_results * 2, 50),
         }
 
-        quota.ensure_within_limit(PLAYLIST_ITEMS_QUOTA_COST)
-        response = requests.get(
-            f"{YOUTUBE_API_BASE}/playlistItems",
-            headers=headers,
-            params=params,
-            timeout=DEFAULT_TIMEOUT_SECONDS,
+        response = _get_charged(
+            f"{YOUTUBE_API_BASE}/playlistItems", headers, params, quota, PLAYLIST_ITEMS_QUOTA_COST, "playlistItems.list"
         )
-        response.raise_for_status()
-        quota.spend("playlistItems.list", PLAYLIST_ITEMS_QUOTA_COST)
 
-        items = response.json().get("items", [])
+        items = serialization.loads(response.content).get("items", [])
         filtered_items: List[Dict[str, Any]] = []
+        published_after_ts = published_after.timestamp()
+        # The uploads playlist is newest-first, so the first older item ends the scan
         for item in items:
-            pub_date = datetime.fromisoformat(item["snippet"]["publishedAt"].replace("Z", "+00:00"))
-            if pub_date >= published_after:
-                filtered_items.append(
-                    {
-                        "id": {"videoId": item["snippet"]["resourceId"]["videoId"]},
-                        "snippet": item["snippet"],
-                    }
-                )
+            if _published_before(item["snippet"]["publishedAt"], published_after_str, published_after_ts):
+                break
+            filtered_items.append(
+                {
+                    "id": {"videoId": item["snippet"]["resourceId"]["videoId"]},
+                    "snippet": item["snippet"],
+                }
+            )
             if len(filtered_items) >= max_results:
                 break
 
         if use_cache:
-            _cache_save("uploads", cache_key_parts, filtered_items)
+            _cache_save("uploads", cache_key, filtered_items)
         return filtered_items
 
     except requests.exceptions.HTTPError as exc:
-        if exc.response is not None and exc.response.status_code in (403, 429):
+        if exc.response is not None and exc.response.status_code in _FALLBACK_STATUSES:
             logger.warning("Quota/permission error fetching uploads for %s: %s", channel_id, exc)
             return []
         raise
@@ -184,16 +330,14 @@ def search_channel_videos(
     max_results: int,
     use_cache: bool,
     quota: QuotaTracker,
+    published_after_str: Optional[str] = None,
 ) -> List[Dict]:
     """Search for videos from a specific channel with caching and fallback to uploads playlist."""
 
-    published_after_str = (
-        published_after.astimezone(timezone.utc)
-        .isoformat(timespec="seconds")
-        .replace("+00:00", "Z")
-    )
-    cache_key_parts = [channel_id, published_after_str, str(max_results)]
-    cached_data = _cache_load("search", cache_key_parts, CacheTTL.DAY, use_cache, quota)
+    if published_after_str is None:
+        published_after_str = _format_published_after(published_after)
+    cache_key = _cache_key(channel_id, published_after_str, str(max_results))
+    cached_data = _cache_load("search", cache_key, CacheTTL.DAY, use_cache, quota, SEARCH_QUOTA_COST)
     if cached_data is not None:
         logger.debug("Using cached search for channel %s", channel_id)
         return cached_data
@@ -210,184 +354,251 @@ def search_channel_videos(
     }
 
     try:
-        quota.ensure_within_limit(SEARCH_QUOTA_COST)
-        response = requests.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT_SECONDS)
-        response.raise_for_status()
-        quota.spend("search.list", SEARCH_QUOTA_COST)
-        result = response.json().get("items", [])
+        response = _get_charged(url, headers, params, quota, SEARCH_QUOTA_COST, "search.list")
+        result = serialization.loads(response.content).get("items", [])
     except QuotaLimitError:
         logger.warning("Quota exhausted before search.list for channel %s", channel_id)
         return []
     except requests.exceptions.HTTPError as exc:
-        if exc.response is not None and exc.response.status_code in (403, 429):
-            logger.warning("Quota/permission error searching channel %s: %s", channel_id, exc)
-            result = get_channel_uploads(access_token, channel_id, published_after, max_results, use_cache, quota)
+        status = exc.response.status_code if exc.response is not None else None
+        # A 403 propagates: the uploads playlist would refuse the same credentials, so the
+        # caller fetches RSS (no credentials) and counts 403s to switch to RSS-only mode
+        if status == 429:
+            logger.warning("Rate limited searching channel %s: %s", channel_id, exc)
+            result = get_channel_uploads(
+                access_token, channel_id, published_after, max_results, use_cache, quota, published_after_str
+            )
         else:
             raise
 
     if use_cache and result:
-        _cache_save("search", cache_key_parts, result)
+        _cache_save("search", cache_key, result)
     return result
 
 
 def get_rss_videos(channel_id: str, published_after: datetime, max_results: int) -> List[Dict]:
     """Get videos from RSS feed (no quota cost)."""
 
-    try:
-        import feedparser
-    except ImportError:
-        logger.warning("feedparser not installed. Run `pip install feedparser` to enable RSS fallback.")
-        return []
-
     rss_url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
     try:
-        feed = feedparser.parse(rss_url)
-    except Exception as exc:
+        response = SESSION.get(rss_url, timeout=RSS_TIMEOUT_SECONDS)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as exc:
         logger.warning("RSS error for channel %s: %s", channel_id, exc)
         return []
 
-    if not getattr(feed, "entries", None):
-        return []
-
     videos: List[Dict[str, Any]] = []
-    for entry in feed.entries[: max_results * 3]:
-        try:
-            pub_date = datetime.fromisoformat(entry.published.replace("Z", "+00:00"))
-        except Exception:  # pragma: no cover - malformed entries
-            continue
-        if pub_date < published_after:
-            continue
-        videos.append(
-            {
-                "id": {"videoId": getattr(entry, "yt_videoid", "")},
-                "snippet": {
-                    "title": entry.title,
-                    "publishedAt": entry.published,
-                    "channelTitle": getattr(entry, "author", "Unknown"),
-                },
-            }
-        )
-        if len(videos) >= max_results:
-            break
+    scanned = 0
+    published_after_ts = published_after.timestamp()
+    # Feed timestamps use "+00:00" rather than the API's "Z"
+    cutoff = published_after.astimezone(timezone.utc).isoformat(timespec="seconds")
+    try:
+        # Feeds list entries newest-first, so the first older entry ends the scan
+        for video_id, title, channel_title, published in _iter_rss_entries(response.content):
+            scanned += 1
+            try:
+                if _published_before(published, cutoff, published_after_ts):
+                    break
+            except ValueError:  # pragma: no cover - malformed entries
+                continue
+            videos.append(
+                {
+                    "id": {"videoId": video_id},
+                    "snippet": {
+                        "title": title,
+                        "publishedAt": published,
+                        "channelTitle": channel_title,
+                    },
+                }
+            )
+            if len(videos) >= max_results or scanned >= max_results * 3:
+                break
+    except ET.ParseError as exc:
+        logger.warning("RSS parse error for channel %s: %s", channel_id, exc)
 
     return videos
 
 
+def _iter_rss_entries(content: bytes) -> Iterator[Tuple[str, str, str, str]]:
+    """Yield (video_id, title, channel_title, published) for each feed entry.
+
+    A single regex pass handles the regular YouTube layout; if it does not account for
+    every <entry> the feed is re-read with ElementTree instead.
+    """
+    matches = _RSS_ENTRY_RE.findall(content)
+    # Count "<entry" so entries carrying attributes (which the regex skips) force the fallback
+    if len(matches) == content.count(b"<entry"):
+        for video_id, title, name, published in matches:
+            yield (
+                video_id.decode("ascii"),
+                html.unescape(title.decode("utf-8")),
+                html.unescape(name.decode("utf-8")) or "Unknown",
+                published.decode("ascii"),
+            )
+        return
+
+    # Stream the Atom feed and read only the fields we use from each <entry>
+    for _, elem in ET.iterparse(BytesIO(content), events=("end",)):
+        if elem.tag != _ENTRY_TAG:
+            continue
+        yield (
+            elem.findtext(f"{_YT}videoId", ""),
+            elem.findtext(f"{_ATOM}title", ""),
+            elem.findtext(f"{_ATOM}author/{_ATOM}name", "Unknown"),
+            elem.findtext(f"{_ATOM}published", ""),
+        )
+        elem.clear()
+
+
 def get_video_details(
     access_token: str,
-    video_ids: List[str],
+    video_ids: Iterable[str],
     use_cache: bool,
     quota: QuotaTracker,
 ) -> List[Dict]:
-    """Get detailed statistics for videos with caching."""
+    """Get detailed statistics for videos with caching (cached per 50-ID chunk).
 
-    if not video_ids:
-        return []
+    IDs are deduplicated and sorted here, so callers may pass them in any order.
+    """
 
-    key_material = "::".join(sorted(video_ids))
-    cache_key_parts = [key_material]
-    cached_data = _cache_load("video_details", cache_key_parts, CacheTTL.DAY, use_cache, quota)
-    if cached_data is not None:
-        logger.debug("Using cached video details for %d videos", len(video_ids))
-        return cached_data
+    # Sorted chunks give stable cache keys, so overlapping ID sets from later runs still hit.
+    # Quota for each uncached chunk is reserved up front before fetching concurrently.
+    ordered_ids = sorted(set(video_ids))
+    if not ordered_ids:
+        return []
 
     url = f"{YOUTUBE_API_BASE}/videos"
     headers = {"Authorization": f"Bearer {access_token}"}
 
-    results: List[Dict[str, Any]] = []
-    for i in range(0, len(video_ids), 50):
-        chunk = video_ids[i : i + 50]
-        units = VIDEO_DETAILS_QUOTA_COST * len(chunk)
+    # Per-chunk item lists in sorted-ID order, so the result order doesn't depend on cache hits
+    chunk_items: List[List[Dict[str, Any]]] = []
+    pending: List[Tuple[int, str, List[str]]] = []
+    cached_count = 0
+    queued = 0
+    ids_iter = iter(ordered_ids)
+    while chunk := list(islice(ids_iter, 50)):
+        cache_key = _video_chunk_key(chunk)
+        cached_items = _cache_load(
+            "video_details", cache_key, CacheTTL.DAY, use_cache, quota, VIDEO_DETAILS_QUOTA_COST * len(chunk)
+        )
+        if cached_items is not None:
+            chunk_items.append(cached_items)
+            cached_count += len(cached_items)
+            continue
         try:
-            quota.ensure_within_limit(units)
+            quota.charge(VIDEO_DETAILS_QUOTA_COST * len(chunk), "videos.list")
         except QuotaLimitError:
             logger.warning(
-                "Quota limit reached before fetching video details. Processed %d/%d videos.",
-                len(results),
-                len(video_ids),
+                "Quota limit reached before fetching video details. Fetching %d/%d videos.",
+                queued,
+                len(ordered_ids),
             )
             break
+        queued += len(chunk)
+        pending.append((len(chunk_items), cache_key, chunk))
+        chunk_items.append([])
+
+    if cached_count:
+        logger.debug("Using cached video details for %d videos", cached_count)
 
+    def fetch_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
         params = {
             "part": "snippet,statistics",
             "id": ",".join(chunk),
             "maxResults": 50,
+            "fields": _VIDEO_DETAIL_FIELDS,
         }
-
-        response = requests.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT_SECONDS)
+        # Units were reserved when the chunk was queued; a failed call gives them back
+        units = VIDEO_DETAILS_QUOTA_COST * len(chunk)
         try:
+            response = SESSION.get(url, headers=headers, params=params, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
         except requests.exceptions.HTTPError as exc:
-            if exc.response is not None and exc.response.status_code in (403, 429):
+            quota.refund(units, "videos.list")
+            if exc.response is not None and exc.response.status_code in _FALLBACK_STATUSES:
                 logger.warning("Quota/permission error fetching video details: %s", exc)
-                break
+                return []
             raise
+        except requests.exceptions.RequestException:
+            quota.refund(units, "videos.list")
+            raise
+        return serialization.loads(response.content).get("items", [])
 
-        quota.spend("videos.list", units)
-        results.extend(response.json().get("items", []))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        fetched = executor.map(fetch_chunk, [chunk for _, _, chunk in pending])
+        for (slot, cache_key, _), items in zip(pending, fetched):
+            chunk_items[slot] = items
+            if use_cache and items:
+                _cache_save("video_details", cache_key, items)
 
-    if use_cache and results:
-        _cache_save("video_details", cache_key_parts, results)
-    return results
+    return [item for items in chunk_items for item in items]
 
 
 def human_int(n: Optional[str]) -> int:
     """Convert string to int, return 0 if invalid."""
-    try:
-        return int(n) if n is not None else 0
-    except Exception:
-        return 0
+    # API counts are non-negative decimal strings; checking avoids try/except per field
+    if isinstance(n, str):
+        return int(n) if n.isdecimal() else 0
+    return n if isinstance(n, int) else 0
 
 
-def assemble_results(video_items: List[Dict], sort_by: str = "views") -> List[Dict]:
-    """Assemble and sort video results."""
-    assembled = []
-    seen_video_ids = set()
+_EMPTY: Dict[str, Any] = {}  # shared read-only default for missing snippet/statistics
+_WATCH_URL = "https://www.youtube.com/watch?v="
+
+
+def assemble_results(video_items: List[Dict], sort_by: str = "views", limit: Optional[int] = None) -> List[Dict]:
+    """Assemble and sort video results (only the top `limit` rows when given)."""
+    assembled: Dict[str, Dict[str, Any]] = {}
+    _human_int = human_int  # local name: skips a global lookup per metric
     
     for v in video_items:
         vid = v.get("id")
-        if not vid or vid in seen_video_ids:
+        if not vid:
             continue
         
-        seen_video_ids.add(vid)
-        snippet = v.get("snippet", {})
-        stats = v.get("statistics", {})
+        # Bound .get methods: one attribute lookup per dict instead of one per field
+        snippet_get = v.get("snippet", _EMPTY).get
+        stats_get = v.get("statistics", _EMPTY).get
         
-        assembled.append({
+        assembled[vid] = {
             "videoId": vid,
-            "title": snippet.get("title", ""),
-            "channelTitle": snippet.get("channelTitle", ""),
-            "publishedAt": snippet.get("publishedAt", ""),
-            "views": human_int(stats.get("viewCount")),
-            "likes": human_int(stats.get("likeCount")),
-            "comments": human_int(stats.get("commentCount")),
-            "url": f"https://www.youtube.com/watch?v={vid}",
-        })
+            "title": snippet_get("title", ""),
+            "channelTitle": snippet_get("channelTitle", ""),
+            "publishedAt": snippet_get("publishedAt", ""),
+            "views": _human_int(stats_get("viewCount")),
+            "likes": _human_int(stats_get("likeCount")),
+            "comments": _human_int(stats_get("commentCount")),
+            "url": f"{_WATCH_URL}{vid}",
+        }
     
-    sort_key = sort_by if sort_by in ["views", "likes", "comments"] else "views"
-    return sorted(assembled, key=lambda x: x[sort_key], reverse=True)
+    sort_key = itemgetter(sort_by if sort_by in _VALID_SORTS else "views")
+    if limit is None:
+        return sorted(assembled.values(), key=sort_key, reverse=True)
+    # Same order as sorted(...)[:limit] but O(n log limit)
+    return heapq.nlargest(limit, assembled.values(), key=sort_key)
 
 
 def print_table(rows: List[Dict], limit: int, sort_by: str = "views") -> None:
     """Print results in table format."""
     limit = min(limit, len(rows))
     metric_name = sort_by.title()
-    print(f"\nTop {limit} videos from your subscriptions by {metric_name}:")
-    print("-" * 100)
-    print(f"{'Rank':>4}  {metric_name:>12}  {'Channel':<20}  {'Title':<50}")
-    print("-" * 100)
-    
+    separator = "-" * 100
+    # Build the whole table and write it once rather than one print() per line
+    lines = [
+        f"\nTop {limit} videos from your subscriptions by {metric_name}:",
+        separator,
+        f"{'Rank':>4}  {metric_name:>12}  {'Channel':<20}  {'Title':<50}",
+        separator,
+    ]
     for i, row in enumerate(rows[:limit], 1):
-        metric_value = row[sort_by]
-        channel = row['channelTitle'][:20]
-        title = row['title'][:50]
-        print(f"{i:>4}  {metric_value:>12,}  {channel:<20}  {title:<50}")
-    print("-" * 100)
+        lines.append(f"{i:>4}  {row[sort_by]:>12,d}  {row['channelTitle'][:20]:<20}  {row['title'][:50]:<50}")
+    lines.append(separator)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def save_to_json(rows: List[Dict], path: str, limit: int) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(rows[:limit], f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(serialization.dumps(rows[:limit], indent=True))
     logger.info("Results written to %s", path)
 
 
@@ -395,7 +606,7 @@ def _estimate_quota_usage(max_subscriptions: int, videos_per_channel: int) -> in
     subs = SUBSCRIPTIONS_QUOTA_COST
     search = max_subscriptions * SEARCH_QUOTA_COST
     videos = max_subscriptions * videos_per_channel * VIDEO_DETAILS_QUOTA_COST
-    uploads = max_subscriptions * (CHANNELS_QUOTA_COST + PLAYLIST_ITEMS_QUOTA_COST)
+    uploads = max_subscriptions * PLAYLIST_ITEMS_QUOTA_COST + (max_subscriptions + 49) // 50 * CHANNELS_QUOTA_COST
     return subs + search + videos + uploads
 
 
@@ -429,46 +640,84 @@ def _collect_videos(
     all_videos: List[Dict[str, Any]] = []
     consecutive_403 = 0
     auto_rss_only = args.rss_fallback
-
-    for batch_start in range(0, len(subscriptions), args.batch_size):
-        batch = subscriptions[batch_start : batch_start + args.batch_size]
-        logger.info(
-            "Processing batch %d/%d",
-            batch_start // args.batch_size + 1,
-            (len(subscriptions) + args.batch_size - 1) // args.batch_size,
-        )
-        for index, sub in enumerate(batch, batch_start + 1):
-            channel_title = sub["snippet"]["title"]
-            channel_id = sub['snippet']['resourceId']['channelId']
-            logger.info("[%d/%d] %s", index, len(subscriptions), channel_title)
-            try:
-                if auto_rss_only or args.rss_fallback:
-                    videos = get_rss_videos(channel_id, published_after, args.videos_per_channel)
-                else:
-                    videos = search_channel_videos(
-                        access_token, channel_id, published_after, args.videos_per_channel, not args.no_cache, quota
-                    )
-                all_videos.extend(videos)
-                consecutive_403 = 0
-            except QuotaLimitError as exc:
-                logger.warning("Quota limit reached while processing channel %s: %s", channel_title, exc)
-                return all_videos
-            except requests.exceptions.HTTPError as exc:
-                if exc.response is not None and exc.response.status_code == 403:
-                    consecutive_403 += 1
-                    logger.warning("403 error (%d/3) for channel %s: %s", consecutive_403, channel_title, exc)
-                    if consecutive_403 >= 2 and not auto_rss_only:
-                        auto_rss_only = True
-                        logger.warning("Switching to RSS-only mode due to repeated 403 errors")
-                        videos = get_rss_videos(channel_id, published_after, args.videos_per_channel)
-                        if videos:
-                            all_videos.extend(videos)
-                else:
+    published_after_str = _format_published_after(published_after)
+    use_cache = not args.no_cache
+    # Pull the two fields used per channel out of the nested dicts once, as parallel lists
+    channel_ids = [sub["snippet"]["resourceId"]["channelId"] for sub in subscriptions]
+    channel_titles = [sub["snippet"]["title"] for sub in subscriptions]
+    total = len(channel_ids)
+
+    if not auto_rss_only:
+        # Resolve every uploads playlist up front (1 unit per 50 channels, cached for a month)
+        # so a search fallback never spends a channels.list call per channel.
+        try:
+            get_uploads_playlists(access_token, channel_ids, use_cache, quota)
+        except (QuotaLimitError, requests.exceptions.RequestException) as exc:
+            logger.warning("Could not prefetch uploads playlists: %s", exc)
+
+    videos_per_channel = args.videos_per_channel
+    batch_size = args.batch_size
+    # Bind the per-run arguments once; only the channel ID varies per call
+    fetch_search = partial(
+        search_channel_videos,
+        access_token,
+        published_after=published_after,
+        max_results=videos_per_channel,
+        use_cache=use_cache,
+        quota=quota,
+        published_after_str=published_after_str,
+    )
+    fetch_rss = partial(get_rss_videos, published_after=published_after, max_results=videos_per_channel)
+
+    def fetch_one(channel_id: str, use_rss: bool) -> List[Dict[str, Any]]:
+        return fetch_rss(channel_id) if use_rss else fetch_search(channel_id)
+
+    # Channels within a batch are fetched concurrently; results are handled in order on
+    # this thread, so the 403 counter and RSS switch need no locking (quota is thread-safe).
+    # One worker per channel in the batch (up to the connection pool size), so a batch
+    # costs about one round trip rather than several.
+    workers = max(1, min(batch_size, total, HTTP_POOL_SIZE))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch_start in range(0, total, batch_size):
+            batch_end = min(batch_start + batch_size, total)
+            logger.info(
+                "Processing batch %d/%d",
+                batch_start // batch_size + 1,
+                (total + batch_size - 1) // batch_size,
+            )
+            futures = [
+                executor.submit(fetch_one, channel_ids[i], auto_rss_only) for i in range(batch_start, batch_end)
+            ]
+            for i, future in zip(range(batch_start, batch_end), futures):
+                channel_title = channel_titles[i]
+                channel_id = channel_ids[i]
+                logger.info("[%d/%d] %s", i + 1, total, channel_title)
+                try:
+                    videos = future.result()
+                    all_videos.extend(videos)
+                    consecutive_403 = 0
+                except QuotaLimitError as exc:
+                    logger.warning("Quota limit reached while processing channel %s: %s", channel_title, exc)
+                    for pending in futures:
+                        pending.cancel()
+                    return all_videos
+                except requests.exceptions.HTTPError as exc:
+                    if exc.response is not None and exc.response.status_code == 403:
+                        consecutive_403 += 1
+                        logger.warning(
+                            "403 error (%d/2) for channel %s, using RSS: %s", consecutive_403, channel_title, exc
+                        )
+                        all_videos.extend(fetch_rss(channel_id))
+                        if consecutive_403 >= 2 and not auto_rss_only:
+                            # Later batches skip search.list entirely
+                            auto_rss_only = True
+                            logger.warning("Switching to RSS-only mode due to repeated 403 errors")
+                    else:
+                        consecutive_403 = 0
+                        logger.warning("Error fetching videos for channel %s: %s", channel_title, exc)
+                except Exception as exc:
                     consecutive_403 = 0
-                    logger.warning("Error fetching videos for channel %s: %s", channel_title, exc)
-            except Exception as exc:
-                consecutive_403 = 0
-                logger.warning("Unexpected error for channel %s: %s", channel_title, exc)
+                    logger.warning("Unexpected error for channel %s: %s", channel_title, exc)
     return all_videos
 
 
@@ -479,16 +728,18 @@ def _prepare_video_details(
     quota: QuotaTracker,
     min_views: int,
 ) -> List[Dict[str, Any]]:
+    # get_video_details sorts these into its canonical chunk order, so a set is all it needs
     video_ids = {v["id"]["videoId"] for v in videos if "id" in v and "videoId" in v["id"]}
     if not video_ids:
         return []
 
     logger.info("Fetching statistics for %d unique videos", len(video_ids))
-    details = get_video_details(access_token, list(video_ids), use_cache, quota)
+    details = get_video_details(access_token, video_ids, use_cache, quota)
 
     if min_views > 0:
         before = len(details)
-        details = [d for d in details if human_int(d.get("statistics", {}).get("viewCount")) >= min_views]
+        _human_int = human_int
+        details = [d for d in details if _human_int(d.get("statistics", {}).get("viewCount")) >= min_views]
         logger.info("Filtered %d videos below %d views", before - len(details), min_views)
 
     return details
@@ -564,7 +815,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             if "id" in v and v["id"].get("videoId")
         ]
 
-    results = assemble_results(video_details, args.sort_by)
+    results = assemble_results(video_details, args.sort_by, args.top)
     if not results:
         logger.info("No results after processing")
         return 0
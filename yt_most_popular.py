@@ -12,17 +12,21 @@ This script complies with YouTube API Services Terms and Policies:
 
 import argparse
 import csv
-import json
+import hashlib
 import os
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
 from requests import Response
 
-from utils import CacheManager, CacheTTL, QuotaLimitError, QuotaTracker, get_logger, setup_logging
+from utils import CacheManager, CacheTTL, QuotaLimitError, QuotaTracker, create_session, get_logger, serialization, setup_logging
 from youtube_auth import get_youtube_token
 
 
@@ -34,13 +38,37 @@ VIDEO_DETAILS_QUOTA_COST = 1
 DAILY_QUOTA_LIMIT = 10000
 SAFETY_BUFFER = 500
 DEFAULT_TIMEOUT_SECONDS = 30
+MAX_WORKERS = 8  # concurrent videos.list chunks
+
+# 403 reasons that mean "slow down" rather than "forbidden"; retried with exponential backoff
+# (429 and 5xx are retried by the session adapter; when those retries run out the final
+# response still surfaces below as an HTTPError)
+_RATE_LIMIT_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded"})
+RATE_LIMIT_RETRIES = 4
+RATE_LIMIT_MAX_DELAY_SECONDS = 30
+
+# Partial response for videos.list: only what assemble_results reads, plus the etag used for revalidation
+_VIDEO_STATS_FIELDS = (
+    "etag,items(id,snippet(title,channelTitle,publishedAt),statistics(viewCount,likeCount,commentCount))"
+)
 
 # Cache settings
 CACHE_DIR = os.path.join(".cache", "most_popular")
+# With --swr, entries older than this are still served but refreshed in the background.
+# Entries past their TTL (24h) are never served.
+SWR_FRESH_SECONDS = CacheTTL.HOUR.value.total_seconds() * 6
+REFRESH_WORKERS = 4
 
 
 logger = get_logger(__name__)
-cache_manager = CacheManager(CACHE_DIR)
+cache_manager = CacheManager(CACHE_DIR, compress=True)  # gzipped; older plain .json entries still load
+
+# Shared keep-alive session (pooled, retries transient errors) for search/videos calls
+SESSION = create_session()
+
+# Background stale-while-revalidate refreshes; the pool only exists once --swr submits one
+_refresh_pool: Optional[ThreadPoolExecutor] = None
+_refresh_pool_lock = threading.Lock()
 
 
 def iso8601(dt: datetime) -> str:
@@ -68,13 +96,23 @@ def _cache_key(*parts: str) -> str:
     return "::".join(parts)
 
 
-def _cache_load(namespace: str, key_parts: List[str], ttl: CacheTTL, use_cache: bool, quota: Optional[QuotaTracker]) -> Optional[Any]:
+def _hash_key(parts: Iterable[Any]) -> str:
+    """Short stable digest of canonical (str/int/tuple) key parts, cheaper than JSON-encoding them."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(repr(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _cache_load(namespace: str, key_parts: List[str], use_cache: bool) -> Optional[Tuple[Any, float]]:
+    """Return (payload, age in seconds) of the cached entry, expired or not, if there is one."""
     if not use_cache:
         return None
-    payload = cache_manager.load(namespace, _cache_key(*key_parts), ttl)
-    if payload is not None and quota is not None:
-        quota.record_saved()
-    return payload
+    entry = cache_manager.load_entry(namespace, _cache_key(*key_parts), ttl=None)
+    if entry is None:
+        return None
+    return entry.payload, time.time() - entry.timestamp
 
 
 def _cache_save(namespace: str, key_parts: List[str], payload: Any) -> None:
@@ -88,44 +126,146 @@ def _build_headers(access_token: Optional[str]) -> Dict[str, str]:
     return headers
 
 
-def _request_json(
+def _fetch_json(
+    url: str,
+    params: Dict[str, Any],
+    headers: Dict[str, str],
+    quota: Optional[QuotaTracker],
+    quota_cost: int,
+    quota_action: str,
+    etag: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """GET `url` and decode the JSON body; None means 304 Not Modified for the given `etag`."""
+    # Reserve quota up front (atomic check-and-add) so concurrent callers can't overshoot;
+    # the reservation is refunded if the request fails
+    billed = quota if quota is not None and quota_cost else None
+    if billed is not None:
+        billed.charge(quota_cost, quota_action)
+
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            response = SESSION.get(url, params=params, headers=headers, timeout=DEFAULT_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            break
+        except requests.exceptions.HTTPError as exc:
+            message, reason = parse_api_error(exc.response)
+            if reason in _RATE_LIMIT_REASONS and attempt < RATE_LIMIT_RETRIES:
+                delay = min(2 ** attempt, RATE_LIMIT_MAX_DELAY_SECONDS)
+                logger.warning("Rate limited during %s (%s); retrying in %ds", quota_action, reason, delay)
+                time.sleep(delay)
+                continue
+            if billed is not None:
+                billed.refund(quota_cost, quota_action)
+            raise SystemExit(
+                f"YouTube API error during {quota_action}: {message} (reason={reason}). "
+                "Check API credentials, enablement (YouTube Data API v3), and quota settings."
+            ) from exc
+        except requests.exceptions.RequestException as exc:
+            if billed is not None:
+                billed.refund(quota_cost, quota_action)
+            raise SystemExit(f"Network error during {quota_action}: {exc}") from exc
+
+    if etag and response.status_code == 304:
+        return None
+    return serialization.loads(response.content)
+
+
+def _revalidate(
     namespace: str,
     key_parts: List[str],
+    cached: Optional[Dict[str, Any]],
     url: str,
     params: Dict[str, Any],
     headers: Dict[str, str],
-    ttl: CacheTTL,
-    use_cache: bool,
     quota: Optional[QuotaTracker],
     quota_cost: int,
     quota_action: str,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
-    cached = _cache_load(namespace, key_parts, ttl, use_cache, quota)
-    if cached is not None:
-        return cached
+    """Fetch fresh data, sending the cached payload's ETag so an unchanged resource costs no body."""
+    etag = cached.get("etag") if cached else None
+    data = _fetch_json(url, params, headers, quota, quota_cost, quota_action, etag=etag)
+    if data is None:
+        logger.debug("%s not modified (etag %s); reusing cached payload", quota_action, etag)
+        data = cached
+    if use_cache:
+        # Re-saving an unchanged payload restarts its TTL
+        _cache_save(namespace, key_parts, data)
+    return data
 
-    if quota is not None and quota_cost:
-        quota.ensure_within_limit(quota_cost)
 
+def _refresh(
+    namespace: str,
+    key_parts: List[str],
+    cached: Dict[str, Any],
+    url: str,
+    params: Dict[str, Any],
+    headers: Dict[str, str],
+    quota: Optional[QuotaTracker],
+    quota_cost: int,
+    quota_action: str,
+) -> None:
+    """Re-fetch a stale cache entry; failures keep the stale copy."""
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=DEFAULT_TIMEOUT_SECONDS)
-        response.raise_for_status()
-    except requests.exceptions.HTTPError as exc:
-        message, reason = parse_api_error(exc.response)
-        raise SystemExit(
-            f"YouTube API error during {quota_action}: {message} (reason={reason}). "
-            "Check API credentials, enablement (YouTube Data API v3), and quota settings."
-        ) from exc
+        _revalidate(namespace, key_parts, cached, url, params, headers, quota, quota_cost, quota_action)
+    except QuotaLimitError as exc:
+        logger.debug("Background refresh of %s skipped: %s", quota_action, exc)
+    except (SystemExit, requests.exceptions.RequestException, ValueError) as exc:
+        # Nothing reads the future's result, so log here or the failure is lost
+        logger.warning("Background refresh of %s failed; keeping stale copy: %s", quota_action, exc)
 
-    data = response.json()
 
-    if quota is not None and quota_cost:
-        quota.spend(quota_action, quota_cost)
+def _refresh_executor() -> ThreadPoolExecutor:
+    """Return the background refresh pool, creating it on first use."""
+    global _refresh_pool
+    with _refresh_pool_lock:
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="swr")
+        return _refresh_pool
 
-    if use_cache:
-        _cache_save(namespace, key_parts, data)
 
-    return data
+def wait_for_refreshes() -> None:
+    """Block until background refreshes submitted so far have finished, then release the pool."""
+    global _refresh_pool
+    with _refresh_pool_lock:
+        pool, _refresh_pool = _refresh_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def _request_json(
+    namespace: str,
+    key_parts: List[str],
+    url: str,
+    params: Dict[str, Any],
+    headers: Dict[str, str],
+    ttl: CacheTTL,
+    use_cache: bool,
+    quota: Optional[QuotaTracker],
+    quota_cost: int,
+    quota_action: str,
+    swr: bool = False,
+) -> Dict[str, Any]:
+    hit = _cache_load(namespace, key_parts, use_cache)
+    cached = None
+    if hit is not None:
+        cached, age = hit
+        if age <= ttl.value.total_seconds():
+            if quota is not None:
+                quota.record_saved()
+            if swr and age > SWR_FRESH_SECONDS:
+                _refresh_executor().submit(
+                    _refresh, namespace, key_parts, cached, url, params, headers, quota, quota_cost, quota_action
+                )
+            return cached
+        # Expired: never served as-is, only kept for its ETag
+
+    return _revalidate(
+        namespace, key_parts, cached, url, params, headers, quota, quota_cost, quota_action, use_cache
+    )
 
 
 def search_videos(
@@ -138,8 +278,14 @@ def search_videos(
     query: Optional[str],
     quota: QuotaTracker,
     use_cache: bool,
+    on_page: Optional[Callable[[List[Dict]], None]] = None,
+    swr: bool = False,
 ) -> List[Dict]:
-    """Search for recently published videos and return API search items."""
+    """Search for recently published videos and return API search items.
+
+    `on_page`, if given, is called with each page's items as soon as it arrives.
+    With `swr`, stale cached pages are returned at once and refreshed in the background.
+    """
 
     if max_results <= 0:
         return []
@@ -161,95 +307,102 @@ def search_videos(
     url = f"{YOUTUBE_API_BASE}/search"
 
     items: List[Dict[str, Any]] = []
-    next_page_token: Optional[str] = None
 
-    while len(items) < max_results:
+    def fetch_page(page_token: Optional[str]) -> Dict[str, Any]:
         params = dict(base_params)
-        if next_page_token:
-            params["pageToken"] = next_page_token
-
-        key_parts = [json.dumps({k: v for k, v in params.items() if k != "key"}, sort_keys=True)]
-
-        try:
-            data = _request_json(
-                namespace="search",
-                key_parts=key_parts,
-                url=url,
-                params=params,
-                headers=headers,
-                ttl=CacheTTL.DAY,
-                use_cache=use_cache,
-                quota=quota,
-                quota_cost=SEARCH_QUOTA_COST,
-                quota_action="search.list",
-            )
-        except QuotaLimitError as exc:
-            logger.warning("Quota limit reached during search.list: %s", exc)
-            break
-
-        page_items = data.get("items", [])
-        items.extend(page_items)
-        logger.debug("search.list returned %d items (total=%d)", len(page_items), len(items))
-
-        if len(items) >= max_results:
-            break
-
-        next_page_token = data.get("nextPageToken")
-        if not next_page_token:
-            break
-
-    return items[:max_results]
-
+        if page_token:
+            params["pageToken"] = page_token
+        key_parts = [_hash_key((url, *sorted((k, v) for k, v in params.items() if k != "key")))]
+        return _request_json(
+            namespace="search",
+            key_parts=key_parts,
+            url=url,
+            params=params,
+            headers=headers,
+            ttl=CacheTTL.DAY,
+            use_cache=use_cache,
+            quota=quota,
+            quota_cost=SEARCH_QUOTA_COST,
+            quota_action="search.list",
+            swr=swr,
+        )
 
-def fetch_video_stats(
+    # Pages are token-chained, but page k+1 can be requested as soon as page k arrives,
+    # overlapping its round trip with on_page and the caller's work on page k
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(fetch_page, None)
+        while pending is not None:
+            try:
+                data = pending.result()
+            except QuotaLimitError as exc:
+                logger.warning("Quota limit reached during search.list: %s", exc)
+                break
+
+            page_items = data.get("items", [])[: max_results - len(items)]
+            next_page_token = data.get("nextPageToken")
+            # Only request a page that will be used, so no quota is spent on discarded speculation
+            if next_page_token and len(items) + len(page_items) < max_results:
+                pending = executor.submit(fetch_page, next_page_token)
+            else:
+                pending = None
+
+            items.extend(page_items)
+            if on_page is not None and page_items:
+                on_page(page_items)
+            logger.debug("search.list returned %d items (total=%d)", len(page_items), len(items))
+
+    return items
+
+
+def fetch_video_chunk(
     api_key: Optional[str],
     access_token: Optional[str],
-    video_ids: List[str],
+    chunk: List[str],
     quota: QuotaTracker,
     use_cache: bool,
+    swr: bool = False,
 ) -> List[Dict]:
-    """Fetch snippet and statistics for given video IDs."""
-
-    if not video_ids:
-        return []
+    """Fetch snippet and statistics for up to 50 video IDs (one videos.list call)."""
 
-    headers = _build_headers(access_token)
-    url = f"{YOUTUBE_API_BASE}/videos"
-    results: List[Dict[str, Any]] = []
+    params: Dict[str, Any] = {
+        "id": ",".join(chunk),
+        "part": "snippet,statistics",
+        "fields": _VIDEO_STATS_FIELDS,
+        "maxResults": 50,
+    }
+    if api_key:
+        params["key"] = api_key
+
+    data = _request_json(
+        namespace="videos",
+        key_parts=[_hash_key(sorted(chunk))],
+        url=f"{YOUTUBE_API_BASE}/videos",
+        params=params,
+        headers=_build_headers(access_token),
+        ttl=CacheTTL.DAY,
+        use_cache=use_cache,
+        quota=quota,
+        quota_cost=VIDEO_DETAILS_QUOTA_COST * len(chunk),
+        quota_action="videos.list",
+        swr=swr,
+    )
+    return data.get("items", [])
 
-    for chunk in batched(video_ids, 50):
-        params: Dict[str, Any] = {
-            "id": ",".join(chunk),
-            "part": "snippet,statistics,contentDetails",
-            "maxResults": 50,
-        }
-        if api_key:
-            params["key"] = api_key
 
-        key_parts = ["::".join(sorted(chunk))]
-        cost = VIDEO_DETAILS_QUOTA_COST * len(chunk)
+def collect_video_chunks(futures: List["Future[List[Dict]]"]) -> List[Dict]:
+    """Gather `fetch_video_chunk` futures in submission order, stopping at the quota limit."""
 
+    results: List[Dict[str, Any]] = []
+    for future in futures:
         try:
-            data = _request_json(
-                namespace="videos",
-                key_parts=key_parts,
-                url=url,
-                params=params,
-                headers=headers,
-                ttl=CacheTTL.DAY,
-                use_cache=use_cache,
-                quota=quota,
-                quota_cost=cost,
-                quota_action="videos.list",
-            )
+            chunk_items = future.result()
         except QuotaLimitError as exc:
             logger.warning("Quota limit reached during videos.list: %s", exc)
+            for pending in futures:
+                pending.cancel()
             break
-
-        chunk_items = data.get("items", [])
         results.extend(chunk_items)
         logger.debug("videos.list returned %d items (total=%d)", len(chunk_items), len(results))
-
     return results
 
 
@@ -268,40 +421,43 @@ def parse_api_error(resp: Optional[Response]) -> Tuple[str, str]:
 
 
 def human_int(n: Optional[str]) -> int:
-    try:
-        return int(n) if n is not None else 0
-    except Exception:
-        return 0
+    # API counts are non-negative decimal strings; checking avoids try/except per field
+    if isinstance(n, str):
+        return int(n) if n.isdecimal() else 0
+    return n if isinstance(n, int) else 0
+
+
+_VALID_SORTS = frozenset({"views", "likes", "comments"})
+_EMPTY: Dict[str, Any] = {}  # shared read-only default for missing snippet/statistics
+_WATCH_URL = "https://www.youtube.com/watch?v="
 
 
 def assemble_results(video_items: List[Dict], sort_by: str = "views") -> List[Dict]:
-    assembled: List[Dict] = []
-    seen_video_ids = set()  # Track seen video IDs to avoid duplicates
+    # Keyed by video ID: drops duplicates (first seen wins) and keeps insertion order
+    assembled: Dict[str, Dict[str, Any]] = {}
+    _human_int = human_int  # local name: skips a global lookup per metric
 
     for v in video_items:
         vid = v.get("id")
-        if not vid or vid in seen_video_ids:
-            continue  # Skip duplicates
-
-        seen_video_ids.add(vid)
-        snippet = v.get("snippet", {})
-        stats = v.get("statistics", {})
-        assembled.append(
-            {
-                "videoId": vid,
-                "title": snippet.get("title", ""),
-                "channelTitle": snippet.get("channelTitle", ""),
-                "publishedAt": snippet.get("publishedAt", ""),
-                "views": human_int(stats.get("viewCount")),
-                "likes": human_int(stats.get("likeCount")),
-                "comments": human_int(stats.get("commentCount")),
-                "url": f"https://www.youtube.com/watch?v={vid}",
-            }
-        )
+        if not vid or vid in assembled:
+            continue
+
+        snippet_get = v.get("snippet", _EMPTY).get
+        stats_get = v.get("statistics", _EMPTY).get
+        assembled[vid] = {
+            "videoId": vid,
+            "title": snippet_get("title", ""),
+            "channelTitle": snippet_get("channelTitle", ""),
+            "publishedAt": snippet_get("publishedAt", ""),
+            "views": _human_int(stats_get("viewCount")),
+            "likes": _human_int(stats_get("likeCount")),
+            "comments": _human_int(stats_get("commentCount")),
+            "url": f"{_WATCH_URL}{vid}",
+        }
 
     # Sort by the specified metric
-    sort_key = sort_by if sort_by in ["views", "likes", "comments"] else "views"
-    return sorted(assembled, key=lambda x: x[sort_key], reverse=True)
+    sort_key = itemgetter(sort_by if sort_by in _VALID_SORTS else "views")
+    return sorted(assembled.values(), key=sort_key, reverse=True)
 
 
 def print_table(rows: List[Dict], limit: int, sort_by: str = "views") -> None:
@@ -317,33 +473,39 @@ def print_table(rows: List[Dict], limit: int, sort_by: str = "views") -> None:
     print("-" * 80)
 
 
+_CSV_FIELDS = ("videoId", "title", "channelTitle", "publishedAt", "views", "likes", "comments", "url")
+_csv_values = itemgetter(*_CSV_FIELDS)
+
+
 def write_csv(rows: List[Dict], path: str, limit: int) -> None:
-    fieldnames = ["videoId", "title", "channelTitle", "publishedAt", "views", "likes", "comments", "url"]
     with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows[:limit]:
-            writer.writerow(row)
+        writer = csv.writer(f)
+        writer.writerow(_CSV_FIELDS)
+        # Plain tuples: skips DictWriter's per-row field validation and dict lookups
+        writer.writerows(map(_csv_values, rows[:limit]))
 
 
 def write_json(rows: List[Dict], path: str, limit: int) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(rows[:limit], f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(serialization.dumps(rows[:limit], indent=True))
 
 
 def write_markdown(rows: List[Dict], path: str, limit: int, sort_by: str = "views") -> None:
+    metric_name = sort_by.title()
+    lines = [
+        f"# YouTube Most Popular Videos (by {metric_name})\n\n",
+        f"Top {min(limit, len(rows))} videos by {metric_name}:\n\n",
+        f"| Rank | {metric_name} | Title | Channel | Published |\n",
+        "|------|-------|-------|---------|-----------|\n",
+    ]
+    for i, row in enumerate(rows[:limit], 1):
+        title = row['title'].replace('|', '\\|')[:60]
+        channel = row['channelTitle'].replace('|', '\\|')[:30]
+        published = row['publishedAt'][:10]
+        metric_value = row[sort_by]
+        lines.append(f"| {i} | {metric_value:,} | [{title}]({row['url']}) | {channel} | {published} |\n")
     with open(path, "w", encoding="utf-8") as f:
-        metric_name = sort_by.title()
-        f.write(f"# YouTube Most Popular Videos (by {metric_name})\n\n")
-        f.write(f"Top {min(limit, len(rows))} videos by {metric_name}:\n\n")
-        f.write(f"| Rank | {metric_name} | Title | Channel | Published |\n")
-        f.write("|------|-------|-------|---------|-----------|\n")
-        for i, row in enumerate(rows[:limit], 1):
-            title = row['title'].replace('|', '\\|')[:60]
-            channel = row['channelTitle'].replace('|', '\\|')[:30]
-            published = row['publishedAt'][:10]
-            metric_value = row[sort_by]
-            f.write(f"| {i} | {metric_value:,} | [{title}]({row['url']}) | {channel} | {published} |\n")
+        f.write("".join(lines))
 
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
@@ -365,6 +527,7 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--md", default=os.getenv("YT_MD_PATH"), help="Markdown path (env: YT_MD_PATH)")
     parser.add_argument("--no-cache", action="store_true", help="Disable caching (force fresh API calls)")
     parser.add_argument("--clear-cache", action="store_true", help="Clear all cached data before running")
+    parser.add_argument("--swr", action="store_true", help="Serve cached data older than 6h immediately and refresh it in the background")
     parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "INFO"), help="Logging level (env: LOG_LEVEL)")
     return parser.parse_args(argv)
 
@@ -440,45 +603,68 @@ def main(argv: Optional[List[str]] = None) -> int:
         search_query or "(default)",
     )
 
-    search_items = search_videos(
-        api_key=api_key,
-        access_token=access_token,
-        region_code=args.region,
-        published_after=published_after_dt,
-        max_results=max(1, args.max_results),
-        topic_id=args.topic_id,
-        query=search_query,
-        quota=quota,
-        use_cache=use_cache,
-    )
+    # Pipeline: fetch stats for each search page's new IDs while the next page is requested.
+    # Every videos.list chunk goes to this one executor, so MAX_WORKERS caps concurrent calls.
+    seen_ids: Dict[str, None] = {}
+    stats_futures: List["Future[List[Dict]]"] = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+
+        def on_page(page_items: List[Dict]) -> None:
+            new_ids = []
+            for it in page_items:
+                vid = it.get("id", {}).get("videoId")
+                if vid and vid not in seen_ids:
+                    seen_ids[vid] = None
+                    new_ids.append(vid)
+            for chunk in batched(new_ids, 50):
+                stats_futures.append(
+                    executor.submit(fetch_video_chunk, api_key, access_token, chunk, quota, use_cache, args.swr)
+                )
+
+        search_items = search_videos(
+            api_key=api_key,
+            access_token=access_token,
+            region_code=args.region,
+            published_after=published_after_dt,
+            max_results=max(1, args.max_results),
+            topic_id=args.topic_id,
+            query=search_query,
+            quota=quota,
+            use_cache=use_cache,
+            on_page=on_page,
+            swr=args.swr,
+        )
+
+        logger.info("Search returned %d items", len(search_items))
+        video_ids = [it.get("id", {}).get("videoId") for it in search_items if it.get("id", {}).get("videoId")]
+        logger.info("Extracted %d video IDs (%d unique)", len(video_ids), len(seen_ids))
 
-    logger.info("Search returned %d items", len(search_items))
-    video_ids = [it.get("id", {}).get("videoId") for it in search_items if it.get("id", {}).get("videoId")]
-    unique_video_ids = list(dict.fromkeys(filter(None, video_ids)))
-    logger.info("Extracted %d video IDs (%d unique)", len(video_ids), len(unique_video_ids))
+        video_items = collect_video_chunks(stats_futures)
 
-    if not unique_video_ids:
+    if not seen_ids:
         print("No videos found.")
         print("Possible causes: API not enabled, key restrictions, limited results, or quota exhaustion.")
         return 0
-
-    video_items = fetch_video_stats(api_key, access_token, unique_video_ids, quota, use_cache)
     rows = assemble_results(video_items, args.sort_by)
 
+    # Refreshes charge quota too; let them finish so the reported usage is complete
+    wait_for_refreshes()
     print(f"\nFinal quota usage: {quota.used} units")
     if quota.saved > 0:
         print(f"Quota saved by caching: {quota.saved} requests")
 
-    print_table(rows, args.top, args.sort_by)
+    # Slice once; the table and every writer share the same top rows
+    top_rows = rows[: args.top]
+    print_table(top_rows, args.top, args.sort_by)
 
     if args.csv:
-        write_csv(rows, args.csv, args.top)
+        write_csv(top_rows, args.csv, args.top)
         print(f"Wrote CSV: {args.csv}")
     if args.json_out:
-        write_json(rows, args.json_out, args.top)
+        write_json(top_rows, args.json_out, args.top)
         print(f"Wrote JSON: {args.json_out}")
     if args.md:
-        write_markdown(rows, args.md, args.top, args.sort_by)
+        write_markdown(top_rows, args.md, args.top, args.sort_by)
         print(f"Wrote Markdown: {args.md}")
 
     logger.info(
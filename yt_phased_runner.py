@@ -17,6 +17,7 @@ import os
 import sys
 import time
 from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from typing import Dict, List
 
 from youtube_auth import get_youtube_token
@@ -75,6 +76,22 @@ class QuotaManager:
         """Get remaining quota."""
         return max(0, self.daily_limit - SAFETY_BUFFER - self.used)
 
+
+class AdaptiveBackoff:
+    """Inter-batch delay that grows while batches fail and resets after a clean one."""
+
+    def __init__(self, initial: float = 0.5, max_delay: float = 8.0):
+        self.initial = initial
+        self.max_delay = max_delay
+        self.delay = 0.0
+
+    def wait(self, had_error: bool):
+        """Pause between batches only after errors, doubling the delay on each failing batch."""
+        self.delay = min(self.delay * 2 or self.initial, self.max_delay) if had_error else 0.0
+        if self.delay:
+            time.sleep(self.delay)
+
+
 def run_phase_1_subscriptions(quota_manager: QuotaManager, max_channels: int = 50) -> List[Dict]:
     """Phase 1: Get subscriptions (1 quota unit)."""
     print("=== PHASE 1: Getting Subscriptions ===")
@@ -120,6 +137,7 @@ def run_phase_2_search(quota_manager: QuotaManager, subscriptions: List[Dict],
     access_token = get_youtube_token()
     
     batch_count = 0
+    backoff = AdaptiveBackoff()
     for i in range(0, len(subscriptions), channels_per_batch):
         batch = subscriptions[i:i+channels_per_batch]
         batch_cost = len(batch) * SEARCH_COST
@@ -131,6 +149,7 @@ def run_phase_2_search(quota_manager: QuotaManager, subscriptions: List[Dict],
         
         print(f"🔍 Processing batch {batch_count + 1}: channels {i+1}-{min(i+channels_per_batch, len(subscriptions))}")
         
+        had_error = False
         for sub in batch:
             channel_id = sub["snippet"]["resourceId"]["channelId"]
             channel_name = sub["snippet"]["title"]
@@ -156,6 +175,7 @@ def run_phase_2_search(quota_manager: QuotaManager, subscriptions: List[Dict],
                 print(f"    ✅ Found {len(videos)} videos")
                 
             except Exception as e:
+                had_error = True
                 print(f"    ❌ Error: {e}")
         
         quota_manager.use_quota(batch_cost)
@@ -167,8 +187,8 @@ def run_phase_2_search(quota_manager: QuotaManager, subscriptions: List[Dict],
         
         print(f"💾 Saved progress. Total videos: {len(all_videos)}, Quota used: {batch_cost}")
         
-        # Small delay between batches
-        time.sleep(1)
+        # Back off only when the batch hit errors (e.g. 403/429)
+        backoff.wait(had_error)
     
     return all_videos
 
@@ -190,12 +210,12 @@ def run_phase_3_stats(quota_manager: QuotaManager, all_videos: List[Dict],
     from yt_subscription_podcasts import get_video_stats
     access_token = get_youtube_token()
     
-    # Get unique video IDs not yet processed
-    video_ids = []
-    for video_data in all_videos:
-        video_id = video_data["video_id"]
-        if video_id not in processed_ids:
-            video_ids.append(video_id)
+    # Get unique video IDs not yet processed (order-preserving dedupe)
+    video_ids = [
+        video_id
+        for video_id in dict.fromkeys(video_data["video_id"] for video_data in all_videos)
+        if video_id not in processed_ids
+    ]
     
     if not video_ids:
         print("✅ All video stats already collected")
@@ -204,6 +224,7 @@ def run_phase_3_stats(quota_manager: QuotaManager, all_videos: List[Dict],
     print(f"📊 Need stats for {len(video_ids)} videos")
     
     # Process in batches
+    backoff = AdaptiveBackoff()
     for i in range(0, len(video_ids), videos_per_batch):
         batch = video_ids[i:i+videos_per_batch]
         batch_cost = len(batch) * VIDEO_COST
@@ -215,6 +236,7 @@ def run_phase_3_stats(quota_manager: QuotaManager, all_videos: List[Dict],
         
         print(f"📊 Processing stats batch: {i+1}-{min(i+videos_per_batch, len(video_ids))}")
         
+        had_error = False
         try:
             stats = get_video_stats(access_token, batch, use_cache=True)
             all_stats.update(stats)
@@ -227,10 +249,12 @@ def run_phase_3_stats(quota_manager: QuotaManager, all_videos: List[Dict],
                 json.dump(all_stats, f, indent=2)
             
         except Exception as e:
+            # The failed IDs are not saved, so a later run picks them up again
+            had_error = True
             print(f"❌ Error getting stats: {e}")
-            break
         
-        time.sleep(0.5)
+        # Back off only when the batch hit errors (e.g. 403/429)
+        backoff.wait(had_error)
     
     return all_stats
 
@@ -253,7 +277,7 @@ def combine_results(all_videos: List[Dict], all_stats: Dict, sort_by: str = "vie
             })
     
     # Sort by chosen criteria
-    episodes.sort(key=lambda x: x[sort_by], reverse=True)
+    episodes.sort(key=itemgetter(sort_by), reverse=True)
     return episodes[:top]
 
 def main():
@@ -15,12 +15,16 @@ import csv
 import json
 import os
 import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from operator import itemgetter
 from typing import Any, Dict, List, Optional
 
 import requests
 
-from utils import CacheManager, CacheTTL, QuotaLimitError, QuotaTracker, get_logger, setup_logging
+from utils import CacheManager, CacheTTL, QuotaLimitError, QuotaTracker, create_session, get_logger, setup_logging
 from youtube_auth import get_youtube_token
 
 YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
@@ -34,11 +38,25 @@ PLAYLIST_ITEMS_QUOTA_COST = 1
 DAILY_QUOTA_LIMIT = 10000
 SAFETY_BUFFER = 500
 DEFAULT_TIMEOUT_SECONDS = 30
+RSS_TIMEOUT_SECONDS = 5
+RSS_WORKERS = 16  # concurrent feed downloads in RSS-only mode
+
+# Quota/permission statuses that trigger a fallback instead of an exception
+_FALLBACK_STATUSES = frozenset({403, 429})
+
+# Clark-notation tags for the YouTube Atom feed
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_YT = "{http://www.youtube.com/xml/schemas/2015}"
+_ENTRY_TAG = f"{_ATOM}entry"
 
 
 logger = get_logger(__name__)
 cache_manager = CacheManager(CACHE_DIR)
 
+# Shared keep-alive session (pooled, retries transient errors) for API and RSS calls,
+# sized to the RSS worker pool
+SESSION = create_session(pool_connections=RSS_WORKERS, pool_maxsize=RSS_WORKERS)
+
 
 def _cache_key(*parts: str) -> str:
     return "::".join(parts)
@@ -82,7 +100,7 @@ def get_subscriptions(
         try:
             if quota is not None:
                 quota.ensure_within_limit(SUBSCRIPTIONS_QUOTA_COST)
-            response = requests.get(
+            response = SESSION.get(
                 f"{YOUTUBE_API_BASE}/subscriptions",
                 headers=headers,
                 params=params,
@@ -115,55 +133,62 @@ def get_subscriptions(
 def get_rss_podcasts(channel_id: str, published_after: datetime, max_results: int) -> List[Dict]:
     """Get podcast episodes from RSS feed (no quota cost)."""
 
-    try:
-        import feedparser
-    except ImportError:
-        logger.warning("feedparser not installed. Run `pip install feedparser` to enable RSS mode.")
-        return []
-
     rss_url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
     try:
-        feed = feedparser.parse(rss_url)
-    except Exception as exc:
+        response = SESSION.get(rss_url, timeout=RSS_TIMEOUT_SECONDS)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as exc:
         logger.warning("RSS error for channel %s: %s", channel_id, exc)
         return []
 
-    if not getattr(feed, "entries", None):
-        logger.debug("No RSS entries for channel %s", channel_id)
-        return []
-
     videos: List[Dict[str, Any]] = []
     podcast_keywords = ["podcast", "episode", "show", "ep ", "#"]
+    # YouTube stamps entries in UTC ("...+00:00"), so older ones can be found by string compare;
+    # entries are newest-first, so the first older one ends the scan
+    cutoff = published_after.astimezone(timezone.utc).isoformat(timespec="seconds")
+    scanned = 0
 
-    for entry in feed.entries[: max_results * 2]:
-        try:
-            pub_date = datetime.fromisoformat(entry.published.replace("Z", "+00:00"))
-        except Exception:  # pragma: no cover - malformed feed entries
-            continue
-
-        if pub_date < published_after:
-            continue
-
-        title_lower = entry.title.lower()
-        is_podcast = any(word in title_lower for word in podcast_keywords)
-        video_id = getattr(entry, "yt_videoid", "")
-        if not video_id:
-            continue
+    # Stream the Atom feed and read only the fields we use from each <entry>
+    try:
+        for _, elem in ET.iterparse(BytesIO(response.content), events=("end",)):
+            if elem.tag != _ENTRY_TAG:
+                continue
+            scanned += 1
+            published = elem.findtext(f"{_ATOM}published", "")
+            title = elem.findtext(f"{_ATOM}title", "")
+            video_id = elem.findtext(f"{_YT}videoId", "")
+            channel_title = elem.findtext(f"{_ATOM}author/{_ATOM}name", "Unknown")
+            elem.clear()
+            if scanned > max_results * 2:
+                break
 
-        videos.append(
-            {
-                "id": {"videoId": video_id},
-                "snippet": {
-                    "title": entry.title,
-                    "publishedAt": entry.published,
-                    "channelTitle": getattr(entry, "author", "Unknown"),
-                },
-                "is_podcast": is_podcast,
-            }
-        )
+            if published.endswith("+00:00") and published < cutoff:
+                break
+            try:
+                pub_date = datetime.fromisoformat(published.replace("Z", "+00:00"))
+            except ValueError:  # pragma: no cover - malformed feed entries
+                continue
+            if pub_date < published_after:
+                break
+            if not video_id:
+                continue
 
-        if len(videos) >= max_results:
-            break
+            title_lower = title.lower()
+            videos.append(
+                {
+                    "id": {"videoId": video_id},
+                    "snippet": {
+                        "title": title,
+                        "publishedAt": published,
+                        "channelTitle": channel_title,
+                    },
+                    "is_podcast": any(word in title_lower for word in podcast_keywords),
+                }
+            )
+            if len(videos) >= max_results:
+                break
+    except ET.ParseError as exc:
+        logger.warning("RSS parse error for channel %s: %s", channel_id, exc)
 
     logger.debug("RSS fetched %d items for channel %s", len(videos), channel_id)
     return videos
@@ -207,7 +232,7 @@ def search_channel_podcasts(
     try:
         if quota is not None:
             quota.ensure_within_limit(SEARCH_QUOTA_COST)
-        response = requests.get(
+        response = SESSION.get(
             f"{YOUTUBE_API_BASE}/search",
             headers=headers,
             params=params,
@@ -221,7 +246,7 @@ def search_channel_podcasts(
         logger.warning("Quota exhausted before search.list for channel %s", channel_id)
         return []
     except requests.exceptions.HTTPError as exc:
-        if exc.response is not None and exc.response.status_code in (403, 429):
+        if exc.response is not None and exc.response.status_code in _FALLBACK_STATUSES:
             logger.warning("API error %s when searching channel %s; falling back to RSS", exc.response.status_code, channel_id)
             return get_rss_podcasts(channel_id, published_after, max_results)
         raise
@@ -237,23 +262,28 @@ def get_video_stats(
     use_cache: bool,
     quota: Optional[QuotaTracker],
 ) -> Dict[str, Dict[str, Any]]:
-    """Get statistics for videos with caching and quota tracking."""
+    """Get statistics for videos with caching and quota tracking.
+
+    IDs are deduplicated and sorted, and each 50-ID chunk is cached separately so a
+    later run with a few new videos still reuses the unchanged chunks.
+    """
 
     if not access_token or not video_ids:
         return {}
 
-    cache_parts = ["::".join(sorted(video_ids))]
-    cached = _cache_load("video_stats", cache_parts, CacheTTL.DAY, use_cache, quota)
-    if cached is not None:
-        logger.debug("Using cached video stats for %d videos", len(video_ids))
-        return {item["id"]: item for item in cached}
-
     headers = {"Authorization": f"Bearer {access_token}"}
     stats: Dict[str, Dict[str, Any]] = {}
-    cached_items: List[Dict[str, Any]] = []
+    unique_ids = sorted(set(video_ids))
+
+    for i in range(0, len(unique_ids), 50):
+        chunk = unique_ids[i : i + 50]
+        cache_parts = ["::".join(chunk)]
+        cached = _cache_load("video_stats", cache_parts, CacheTTL.DAY, use_cache, quota)
+        if cached is not None:
+            logger.debug("Using cached video stats for %d videos", len(chunk))
+            stats.update((item["id"], item) for item in cached)
+            continue
 
-    for i in range(0, len(video_ids), 50):
-        chunk = video_ids[i : i + 50]
         units = VIDEO_DETAILS_QUOTA_COST * len(chunk)
 
         try:
@@ -273,7 +303,7 @@ def get_video_stats(
         }
 
         try:
-            response = requests.get(
+            response = SESSION.get(
                 f"{YOUTUBE_API_BASE}/videos",
                 headers=headers,
                 params=params,
@@ -281,7 +311,7 @@ def get_video_stats(
             )
             response.raise_for_status()
         except requests.exceptions.HTTPError as exc:
-            if exc.response is not None and exc.response.status_code in (403, 429):
+            if exc.response is not None and exc.response.status_code in _FALLBACK_STATUSES:
                 logger.warning(
                     "Quota/permission error fetching video stats (chunk %d): %s",
                     (i // 50) + 1,
@@ -293,6 +323,7 @@ def get_video_stats(
         if quota is not None:
             quota.spend("videos.list", units)
 
+        chunk_items: List[Dict[str, Any]] = []
         for item in response.json().get("items", []):
             video_data = {
                 "id": item["id"],
@@ -304,10 +335,10 @@ def get_video_stats(
                 "published": item["snippet"].get("publishedAt", ""),
             }
             stats[item["id"]] = video_data
-            cached_items.append(video_data)
+            chunk_items.append(video_data)
 
-    if use_cache and cached_items:
-        _cache_save("video_stats", cache_parts, cached_items)
+        if use_cache and chunk_items:
+            _cache_save("video_stats", cache_parts, chunk_items)
     return stats
 
 def main():
@@ -392,6 +423,18 @@ def main():
         subscriptions = get_subscriptions(access_token, max_channels, use_cache, quota)
         print(f"Found {len(subscriptions)} subscriptions (limited to {max_channels} to save quota)")
     
+    # RSS feeds cost no quota and are independent, so download them all concurrently up front
+    rss_mode = args.rss_only or args.no_auth
+    rss_results: List[List[Dict]] = []
+    if rss_mode and subscriptions:
+        with ThreadPoolExecutor(max_workers=min(RSS_WORKERS, len(subscriptions))) as executor:
+            rss_results = list(executor.map(
+                lambda sub: get_rss_podcasts(
+                    sub["snippet"]["resourceId"]["channelId"], published_after, args.videos_per_channel
+                ),
+                subscriptions,
+            ))
+
     # Search for podcast episodes
     all_videos = []
     for i, sub in enumerate(subscriptions, 1):
@@ -400,8 +443,8 @@ def main():
         
         print(f"[{i}/{len(subscriptions)}] Checking {channel_name}...")
         
-        if args.rss_only or args.no_auth:
-            videos = get_rss_podcasts(channel_id, published_after, args.videos_per_channel)
+        if rss_mode:
+            videos = rss_results[i - 1]
             print(f"  Found {len(videos)} videos from RSS")
         else:
             videos = search_channel_podcasts(
@@ -452,7 +495,7 @@ def main():
             })
         
         # Sort by publish date since no view counts
-        episodes.sort(key=lambda x: x["published"], reverse=True)
+        episodes.sort(key=itemgetter("published"), reverse=True)
         top_episodes = episodes[:args.top]
         
         print(f"\nTop {len(top_episodes)} recent podcast episodes (RSS mode):")
@@ -481,20 +524,15 @@ def main():
         return 0
 
     # Get video statistics (costs quota)
-    print(f"Fetching video statistics for {len(all_videos)} videos...")
-    print(f"Estimated quota cost: {len(all_videos)} units")
-    video_ids = [v["video_id"] for v in all_videos]
-
-    # Process in batches of 50 (API limit)
-    all_stats = {}
-    for i in range(0, len(video_ids), 50):
-        batch = video_ids[i:i+50]
-        print(f"Processing batch {i//50 + 1}/{(len(video_ids) + 49)//50}...")
-        stats = get_video_stats(access_token, batch, use_cache, quota)
-        if not stats and quota and not quota.can_spend(VIDEO_DETAILS_QUOTA_COST):
-            print("⚠ Quota limit reached while fetching video stats. Using partial results.")
-            break
-        all_stats.update(stats)
+    # Order-preserving dedupe: a video found via several channels is fetched (and billed) once
+    video_ids = list(dict.fromkeys(v["video_id"] for v in all_videos))
+    print(f"Fetching video statistics for {len(video_ids)} videos...")
+    print(f"Estimated quota cost: {len(video_ids)} units")
+
+    # get_video_stats requests (and caches) sorted 50-ID chunks itself
+    all_stats = get_video_stats(access_token, video_ids, use_cache, quota)
+    if len(all_stats) < len(video_ids) and quota and not quota.can_spend(VIDEO_DETAILS_QUOTA_COST):
+        print("⚠ Quota limit reached while fetching video stats. Using partial results.")
     
     # Combine data and sort
     episodes = []
@@ -519,7 +557,7 @@ def main():
         print("No video statistics available. Try enabling caching or reducing limits.")
         return 0
 
-    episodes.sort(key=lambda x: x[args.sort_by], reverse=True)
+    episodes.sort(key=itemgetter(args.sort_by), reverse=True)
     top_episodes = episodes[:args.top]
 
     print(f"\nTop {len(top_episodes)} podcast episodes by {args.sort_by}:")